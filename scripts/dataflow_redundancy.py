@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Thin CLI wrapper; the analyzer lives in scripts/oh_eval/redundancy.py.
+
+from __future__ import annotations
+
+import sys
+
+from oh_eval.redundancy import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Importable evaluation helpers shared by scripts/eval_*.py.
+
+Usage from CI / notebooks (with ``scripts/`` on ``sys.path``)::
+
+    from oh_eval import evaluate_permissions, evaluate_sinks
+
+    report = evaluate_sinks()                # batch, latest run per app
+    report = evaluate_permissions("AdsKit")  # single app
+
+Submodules are imported lazily on first attribute access so ``import oh_eval``
+stays cheap; parsed groundtruth and run artifacts are cached in-process and
+reused across calls until the files change on disk.
+"""
+
+from __future__ import annotations
+
+from importlib import import_module
+
+# Avoid importing typing at runtime (~15 ms); type checkers still honour this guard.
+TYPE_CHECKING = False
+
+_EXPORTS = {
+    "ArtifactCache": "oh_eval.common",
+    "EvalReport": "oh_eval.common",
+    "EvalResult": "oh_eval.common",
+    "find_repo_root": "oh_eval.common",
+    "default_cache": "oh_eval.common",
+    "evaluate_permissions": "oh_eval.permissions",
+    "evaluate_sinks": "oh_eval.sinks",
+    "analyze_redundancy": "oh_eval.redundancy",
+    "regroup_runs": "oh_eval.regroup",
+    "SinkKey": "oh_eval.sinks",
+    "build_search_index": "oh_eval.search",
+    "query_search_index": "oh_eval.search",
+    "export_warehouse": "oh_eval.warehouse",
+    "query_warehouse": "oh_eval.warehouse",
+}
+
+__all__ = sorted(_EXPORTS)
+
+if TYPE_CHECKING:
+    from oh_eval.common import ArtifactCache, EvalReport, EvalResult, default_cache, find_repo_root
+    from oh_eval.permissions import evaluate_permissions
+    from oh_eval.redundancy import analyze_redundancy
+    from oh_eval.regroup import regroup_runs
+    from oh_eval.search import build_search_index, query_search_index
+    from oh_eval.sinks import SinkKey, evaluate_sinks
+    from oh_eval.warehouse import export_warehouse, query_warehouse
+
+
+def __getattr__(name: str) -> object:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import TypeVar
+
+    T = TypeVar("T")
+
+# `stage=<name>` progress marker in the analyze runner's stderr / batch logs (server/src/app/run.ts).
+STAGE_RE = re.compile(r"\bstage=(.+?)\s*$")
+
+
+def find_repo_root(start: Path) -> Path:
+    return _find_repo_root_cached(str(start.resolve()))
+
+
+@lru_cache(maxsize=None)
+def _find_repo_root_cached(start: str) -> Path:
+    cur = Path(start)
+    while True:
+        pkg = cur / "package.json"
+        if pkg.exists():
+            try:
+                data = json.loads(pkg.read_text(encoding="utf-8"))
+                if (
+                    isinstance(data, dict)
+                    and "workspaces" in data
+                    and isinstance(data["workspaces"], list)
+                    and "server" in data["workspaces"]
+                ):
+                    return cur
+            except Exception:
+                pass
+        if cur.parent == cur:
+            return Path(start)
+        cur = cur.parent
+
+
+def resolve_repo_root(repo_root: str | Path | None) -> Path:
+    return Path(repo_root).resolve() if repo_root else find_repo_root(Path.cwd())
+
+
+def resolve_under(repo_root: Path, path: str | Path) -> Path:
+    return Path(path).resolve() if os.path.isabs(path) else (repo_root / path).resolve()
+
+
+def resolve_run_dir(repo_root: Path, run_dir: str | None, run_id: str | None) -> Path:
+    if run_dir and run_id:
+        raise ValueError("Please provide only one of --run-dir or --run-id")
+    if run_dir:
+        p = Path(run_dir)
+        return p if p.is_absolute() else (repo_root / p).resolve()
+    if not run_id:
+        raise ValueError("Missing --run-dir or --run-id")
+    reg = repo_root / "output" / "_runs" / f"{run_id}.json"
+    data = json.loads(reg.read_text(encoding="utf-8"))
+    out_dir = str((data or {}).get("outputDir") or "").strip()
+    if not out_dir:
+        raise ValueError(f"Invalid run registry entry: {reg}")
+    return (repo_root / out_dir).resolve()
+
+
+def find_latest_run_dir(output_root: Path, app: str, marker: str = "meta.json") -> Path | None:
+    app_dir = output_root / app
+    if not app_dir.is_dir():
+        return None
+    candidates: list[Path] = []
+    for child in app_dir.iterdir():
+        if not child.is_dir():
+            continue
+        # Runs are timestamp dirs that always contain meta.json.
+        if (child / marker).is_file():
+            candidates.append(child)
+    if not candidates:
+        return None
+    # Timestamp dirs are formatted as YYYYMMDD-HHMMSS, so lexicographic max matches latest.
+    return max(candidates, key=lambda p: p.name)
+
+
+def iter_run_dirs(output_root: Path) -> Iterable[tuple[str, Path]]:
+    # Yields (app, run_dir) for every output/<app>/<timestamp>/ holding a meta.json, sorted by app then run.
+    if not output_root.is_dir():
+        return
+    for app_dir in sorted(output_root.iterdir()):
+        if not app_dir.is_dir() or app_dir.name.startswith("_"):
+            continue
+        for child in sorted(app_dir.iterdir()):
+            if child.is_dir() and (child / "meta.json").is_file():
+                yield app_dir.name, child
+
+
+def read_json_or_none(file_path: Path) -> object | None:
+    try:
+        return json.loads(file_path.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+
+def as_dicts(value: object) -> list[dict]:
+    return [x for x in value if isinstance(x, dict)] if isinstance(value, list) else []
+
+
+def as_int(value: object) -> int | None:
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    try:
+        return int(str(value).strip())
+    except Exception:
+        return None
+
+
+def normalize_path(text: object) -> str:
+    # Artifact paths are repo-relative with forward slashes; Windows runs may write backslashes.
+    return str(text or "").strip().replace("\\", "/")
+
+
+def read_index_ids(index_file: Path, list_key: str, id_key: str) -> list[str] | None:
+    # Returns None when the index is missing/unreadable so callers can fall back to a directory scan.
+    parsed = read_json_or_none(index_file)
+    items = parsed.get(list_key) if isinstance(parsed, dict) else None
+    if not isinstance(items, list):
+        return None
+    out: list[str] = []
+    for item in items:
+        value = str(item.get(id_key) or "").strip() if isinstance(item, dict) else ""
+        if value and value not in (".", "..") and "/" not in value and "\\" not in value:
+            out.append(value)
+    return out
+
+
+def scandir_names(dir_path: Path) -> list[str]:
+    try:
+        with os.scandir(dir_path) as it:
+            return [e.name for e in it if e.is_dir(follow_symlinks=False)]
+    except OSError:
+        return []
+
+
+def iter_feature_ids(features_root: Path) -> Iterable[str]:
+    ids = read_index_ids(features_root / "index.json", "features", "featureId")
+    return ids if ids is not None else scandir_names(features_root)
+
+
+def iter_feature_dirs(run_dir: Path) -> Iterable[tuple[str, str, Path]]:
+    # Yields (pageId, featureId, pages/<pageId>/features/<featureId>/) following the index files.
+    pages_root = run_dir / "pages"
+    page_ids = read_index_ids(pages_root / "index.json", "pages", "pageId")
+    if page_ids is None:
+        page_ids = scandir_names(pages_root)
+    for page_id in page_ids:
+        features_root = pages_root / page_id / "features"
+        for feature_id in iter_feature_ids(features_root):
+            yield page_id, feature_id, features_root / feature_id
+
+
+def file_signature(file_path: Path) -> list[int] | None:
+    # [mtime_ns, size], or None when the file is missing; used to detect runs that need re-export.
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+def iter_groundtruth_apps(gt_dir: Path, suffix: str) -> Iterable[str]:
+    for p in sorted(gt_dir.glob(f"*{suffix}")):
+        if p.is_file():
+            yield p.stem
+
+
+class ArtifactCache:
+    # Keeps parsed files warm across in-process calls. Entries are keyed by (path, loader) and
+    # revalidated with a single stat: a changed mtime/size reloads the file, a missing file
+    # falls through to the loader so it can apply its own "missing" semantics. At most max_entries
+    # values are kept (least recently used evicted first), and hits are shared between callers, so
+    # loaders should return compact immutable values (frozensets, read-only mappings), not raw JSON.
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, Callable[..., object]], tuple[tuple[int, int], object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path, loader: Callable[[Path], T]) -> T:
+        key = (str(path), loader)
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return loader(path)
+        sig = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None and hit[0] == sig:
+                self._entries.move_to_end(key)
+                return hit[1]  # type: ignore[return-value]
+        value = loader(path)
+        with self._lock:
+            self._entries[key] = (sig, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+default_cache = ArtifactCache()
+
+
+@dataclass(frozen=True)
+class EvalResult:
+    gt: int
+    pred: int
+    tp: int
+    fp: int
+    fn: int
+    recall: float | None
+    precision: float | None
+    false_positive_rate: float | None  # FP / Pred
+    missing: list  # or a disk-backed sinks.SpilledKeys (streaming --details); empty when only counted
+    extra: list
+    invalid_gt_records: int = 0
+    invalid_pred_records: int = 0
+
+
+def make_result(
+    gt_size: int,
+    pred_size: int,
+    missing: list,
+    extra: list,
+    invalid_gt: int = 0,
+    invalid_pred: int = 0,
+    *,
+    fn: int | None = None,
+    fp: int | None = None,
+) -> EvalResult:
+    # fn/fp default to len(missing)/len(extra); callers that only count pass them with empty lists.
+    fn = len(missing) if fn is None else fn
+    fp = len(extra) if fp is None else fp
+    tp = gt_size - fn
+    return EvalResult(
+        gt=gt_size,
+        pred=pred_size,
+        tp=tp,
+        fp=fp,
+        fn=fn,
+        recall=None if gt_size == 0 else tp / gt_size,
+        precision=None if pred_size == 0 else tp / pred_size,
+        false_positive_rate=None if pred_size == 0 else fp / pred_size,
+        missing=missing,
+        extra=extra,
+        invalid_gt_records=invalid_gt,
+        invalid_pred_records=invalid_pred,
+    )
+
+
+def sum_results(results: list[EvalResult]) -> EvalResult:
+    gt = sum(r.gt for r in results)
+    pred = sum(r.pred for r in results)
+    tp = sum(r.tp for r in results)
+    fp = sum(r.fp for r in results)
+    fn = sum(r.fn for r in results)
+    recall = None if gt == 0 else tp / gt
+    precision = None if pred == 0 else tp / pred
+    fpr = None if pred == 0 else fp / pred
+    return EvalResult(
+        gt=gt,
+        pred=pred,
+        tp=tp,
+        fp=fp,
+        fn=fn,
+        recall=recall,
+        precision=precision,
+        false_positive_rate=fpr,
+        missing=[],
+        extra=[],
+        invalid_gt_records=sum(r.invalid_gt_records for r in results),
+        invalid_pred_records=sum(r.invalid_pred_records for r in results),
+    )
+
+
+@dataclass(frozen=True)
+class EvalReport:
+    repo_root: Path
+    groundtruth_dir: Path
+    output_root: Path
+    results: list  # list[AppEval] of the evaluating module
+    totals: EvalResult
+
+
+def counts_json(r: EvalResult) -> dict:
+    return {"gt": r.gt, "pred": r.pred, "tp": r.tp, "fp": r.fp, "fn": r.fn}
+
+
+def fmt_percent(v: float | None) -> str:
+    if v is None:
+        return "/"
+    if not isinstance(v, float) or not (v == v):  # NaN check
+        return "NaN"
+    return f"{v*100:.2f}%"
+
+
+def fmt_ratio(v: float | None) -> str:
+    return "/" if v is None else f"{v:.4f} ({fmt_percent(v)})"
+
+
+def display_width(text: str) -> int:
+    # Terminal columns: CJK (and other wide) characters take two cells.
+    return sum(2 if ord(ch) > 0x2E7F else 1 for ch in text)
+
+
+def split_columns(text: str) -> list[str]:
+    # "--group-by a,b" style option values.
+    return [c.strip() for c in text.split(",") if c.strip()]
+
+
+def render_rows(headers: list[str], rows: list[list[str]]) -> str:
+    # Plain text table padded by display width, so CJK cells line up in a terminal.
+    widths = [max([display_width(h)] + [display_width(r[i]) for r in rows]) for i, h in enumerate(headers)]
+
+    def fmt_row(row: list[str]) -> str:
+        return "  ".join(c + " " * (widths[i] - display_width(c)) for i, c in enumerate(row)).rstrip()
+
+    lines = [fmt_row(headers), fmt_row(["-" * w for w in widths])]
+    lines += [fmt_row(r) for r in rows]
+    return "\n".join(lines)
+
+
+def render_table(rows: list, total: EvalResult) -> str:
+    headers = ["App", "GT", "Pred", "TP", "FP", "FN", "Recall", "FPR"]
+    data_rows: list[list[str]] = []
+    for label, res in [(r.app, r.result) for r in rows] + [("TOTAL", total)]:
+        data_rows.append(
+            [
+                label,
+                str(res.gt),
+                str(res.pred),
+                str(res.tp),
+                str(res.fp),
+                str(res.fn),
+                fmt_ratio(res.recall),
+                fmt_ratio(res.false_positive_rate),
+            ]
+        )
+
+    # Kept byte-identical to the original eval_*.py tables (len() widths, trailing padding), which
+    # CI diffs against; new tools use render_rows.
+    widths = [len(h) for h in headers]
+    for row in data_rows:
+        for i, cell in enumerate(row):
+            widths[i] = max(widths[i], len(cell))
+
+    def fmt_row(row: list[str]) -> str:
+        return "  ".join((row[i] or "").ljust(widths[i]) for i in range(len(headers)))
+
+    lines = [fmt_row(headers), fmt_row(["-" * w for w in widths])]
+    lines += [fmt_row(r) for r in data_rows]
+    return "\n".join(lines)
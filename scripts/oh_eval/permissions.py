@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Iterable
+from dataclasses import dataclass
+from pathlib import Path
+
+from oh_eval.common import (
+    ArtifactCache,
+    EvalReport,
+    EvalResult,
+    counts_json,
+    default_cache,
+    find_latest_run_dir,
+    fmt_ratio,
+    iter_feature_dirs,
+    iter_groundtruth_apps,
+    make_result,
+    read_json_or_none,
+    render_table,
+    resolve_repo_root,
+    resolve_run_dir,
+    resolve_under,
+    sum_results,
+)
+
+
+PERM_RE = re.compile(r"ohos\.permission\.[A-Za-z0-9_]+")
+PRIVACY_FACTS_FILE = "privacy_facts.json"
+
+
+def normalize_permission_token(text: str) -> str:
+    t = (text or "").strip()
+    if not t:
+        return ""
+    # Remove optional hints like "（可选）"
+    t = re.sub(r"（[^）]*）", "", t).strip()
+    return t
+
+
+def extract_permission_names(text: str) -> list[str]:
+    if not text:
+        return []
+    return sorted(set(normalize_permission_token(m.group(0)) for m in PERM_RE.finditer(text) if m.group(0)))
+
+
+def load_groundtruth(file_path: Path) -> frozenset[str]:
+    text = file_path.read_text(encoding="utf-8") if file_path.exists() else ""
+    out: set[str] = set()
+    for line in text.splitlines():
+        t = line.strip()
+        if not t:
+            continue
+        extracted = extract_permission_names(t)
+        if extracted:
+            out.update(extracted)
+            continue
+        norm = normalize_permission_token(t)
+        if norm.startswith("ohos.permission."):
+            out.add(norm)
+    return frozenset(out)
+
+
+def iter_privacy_facts_files(run_dir: Path) -> Iterable[Path]:
+    # Follow the run layout written by the analyzer instead of walking the whole tree:
+    #   app_permissions/privacy_facts.json
+    #   pages/<pageId>/features/<featureId>/privacy_facts.json
+    # pageIds/featureIds come from pages/index.json and features/index.json, falling back to
+    # a scandir of the known directories when an index is missing.
+    app_file = run_dir / "app_permissions" / PRIVACY_FACTS_FILE
+    if app_file.is_file():
+        yield app_file
+
+    for _, _, feature_dir in iter_feature_dirs(run_dir):
+        p = feature_dir / PRIVACY_FACTS_FILE
+        if p.is_file():
+            yield p
+
+
+def extract_predicted_permissions(parsed: object) -> set[str]:
+    perms: set[str] = set()
+    practices = (((parsed or {}).get("facts") or {}).get("permissionPractices")) if isinstance(parsed, dict) else None
+    if not isinstance(practices, list):
+        return perms
+    for p in practices:
+        raw = ""
+        if isinstance(p, dict):
+            raw = str(p.get("permissionName") or "")
+        raw = normalize_permission_token(raw)
+        if not raw or raw == "未识别":
+            continue
+        extracted = extract_permission_names(raw)
+        if extracted:
+            perms.update(extracted)
+        elif raw.startswith("ohos.permission."):
+            perms.add(raw)
+    return perms
+
+
+def load_predicted_permissions(file_path: Path) -> frozenset[str]:
+    return frozenset(extract_predicted_permissions(read_json_or_none(file_path)))
+
+
+def load_privacy_facts_candidates(pages_index: Path) -> tuple[Path, ...]:
+    # Every privacy_facts.json path the run layout can hold, whether or not it exists yet: a missing
+    # file just loads as no permissions, so a file written later is still picked up by its own stat.
+    run_dir = pages_index.parent.parent
+    app_file = run_dir / "app_permissions" / PRIVACY_FACTS_FILE
+    return (app_file,) + tuple(d / PRIVACY_FACTS_FILE for _, _, d in iter_feature_dirs(run_dir))
+
+
+def collect_predicted_permissions(run_dir: Path, max_workers: int | None = None, cache: ArtifactCache | None = None) -> set[str]:
+    perms: set[str] = set()
+    cache = cache if cache is not None else default_cache
+    # Cached on the pages/index.json signature, so warm calls skip re-reading every features/index.json.
+    files = cache.get(run_dir / "pages" / "index.json", load_privacy_facts_candidates)
+    if not files:
+        return perms
+
+    def load(file_path: Path) -> frozenset[str]:
+        return cache.get(file_path, load_predicted_permissions)
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for found in pool.map(load, files):
+            perms.update(found)
+    return perms
+
+
+def evaluate_sets(gt: frozenset[str] | set[str], pred: frozenset[str] | set[str]) -> EvalResult:
+    missing = sorted([p for p in gt if p not in pred])
+    extra = sorted([p for p in pred if p not in gt])
+    return make_result(len(gt), len(pred), missing, extra)
+
+
+@dataclass(frozen=True)
+class AppEval:
+    app: str
+    run_dir: Path | None
+    groundtruth_file: Path
+    result: EvalResult
+
+
+def evaluate_app(app: str, gt_file: Path, run_dir: Path | None, cache: ArtifactCache | None = None) -> AppEval:
+    cache = cache if cache is not None else default_cache
+    gt = cache.get(gt_file, load_groundtruth)
+    pred = collect_predicted_permissions(run_dir, cache=cache) if run_dir and run_dir.exists() else set()
+    return AppEval(app=app, run_dir=run_dir, groundtruth_file=gt_file, result=evaluate_sets(gt, pred))
+
+
+def evaluate_permissions(
+    app: str | None = None,
+    *,
+    run_dir: str | None = None,
+    run_id: str | None = None,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    groundtruth_dir: str | Path = "groundtruth/permission",
+    cache: ArtifactCache | None = None,
+) -> EvalReport:
+    # Evaluate predicted permissions (privacy_facts.json) against groundtruth/permission/<app>.txt.
+    # With app=None every groundtruth file is evaluated against the latest run under output/<app>/.
+    root = resolve_repo_root(repo_root)
+    gt_dir = resolve_under(root, groundtruth_dir)
+    out_root = resolve_under(root, output_root)
+
+    app = (app or "").strip() or None
+    run_dir = (run_dir or "").strip() or None
+    run_id = (run_id or "").strip() or None
+    if (run_dir or run_id) and not app:
+        raise ValueError("--run-dir/--run-id require --app (single-app mode)")
+
+    if app:
+        if run_dir or run_id:
+            target: Path | None = resolve_run_dir(root, run_dir, run_id)
+        else:
+            target = find_latest_run_dir(out_root, app)
+        row = evaluate_app(app, gt_dir / f"{app}.txt", target, cache)
+        rows = [row]
+    else:
+        apps = list(iter_groundtruth_apps(gt_dir, ".txt"))
+        if not apps:
+            raise ValueError(f"No groundtruth permission files found under: {gt_dir}")
+        rows = [evaluate_app(a, gt_dir / f"{a}.txt", find_latest_run_dir(out_root, a), cache) for a in apps]
+
+    return EvalReport(repo_root=root, groundtruth_dir=gt_dir, output_root=out_root, results=rows, totals=sum_results([r.result for r in rows]))
+
+
+def app_eval_json(r: AppEval, details: bool) -> dict:
+    return {
+        "app": r.app,
+        "runDir": str(r.run_dir) if r.run_dir else None,
+        "groundtruthFile": str(r.groundtruth_file),
+        "counts": counts_json(r.result),
+        "recall": r.result.recall,
+        "precision": r.result.precision,
+        "falsePositiveRate": r.result.false_positive_rate,
+        "missing": r.result.missing if details else None,
+        "extra": r.result.extra if details else None,
+    }
+
+
+def report_json(report: EvalReport, details: bool) -> dict:
+    return {
+        "repoRoot": str(report.repo_root),
+        "groundtruthDir": str(report.groundtruth_dir),
+        "outputRoot": str(report.output_root),
+        "results": [app_eval_json(r, details) for r in report.results],
+        "totals": {
+            "counts": counts_json(report.totals),
+            "recall": report.totals.recall,
+            "precision": report.totals.precision,
+            "falsePositiveRate": report.totals.false_positive_rate,
+        },
+    }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Evaluate predicted permissions (from privacy_facts.json) against groundtruth/permission/<app>.txt. If --app is omitted, evaluate all groundtruth files in batch.",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--app", default="", help="App name (groundtruth/permission/<app>.txt). If omitted, batch mode.")
+    parser.add_argument("--run-dir", default="", help="(Single-app) Run directory path (absolute or relative to repo root)")
+    parser.add_argument("--run-id", default="", help="(Single-app) Run id (output/_runs/<runId>.json)")
+    parser.add_argument("--output-root", default="output", help="Output root dir for batch/latest lookup (default: output)")
+    parser.add_argument("--groundtruth-dir", default="groundtruth/permission", help="Groundtruth directory (default: groundtruth/permission)")
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    parser.add_argument("--details", action="store_true", help="Print missing/extra lists")
+    args = parser.parse_args(argv)
+
+    report = evaluate_permissions(
+        args.app,
+        run_dir=args.run_dir,
+        run_id=args.run_id,
+        repo_root=args.repo_root or None,
+        output_root=args.output_root,
+        groundtruth_dir=args.groundtruth_dir,
+    )
+
+    # Single-app mode keeps its own (non-table) output shape.
+    if args.app.strip():
+        row = report.results[0]
+        res = row.result
+        run_dir = row.run_dir if row.run_dir and row.run_dir.exists() else None
+
+        if args.format == "json":
+            payload = app_eval_json(row, args.details)
+            payload["runDir"] = str(run_dir) if run_dir else None
+            print(json.dumps(payload, indent=2, ensure_ascii=False))
+            return 0
+
+        print(f"App: {row.app}")
+        print(f"Run: {run_dir if run_dir else '(missing)'}")
+        print(f"Groundtruth: {row.groundtruth_file}")
+        print(f"Counts: GT={res.gt}, Pred={res.pred}, TP={res.tp}, FP={res.fp}, FN={res.fn}")
+        print(f"Recall (TP/GT): {fmt_ratio(res.recall)}")
+        print(f"False Positive Rate (FP/Pred): {fmt_ratio(res.false_positive_rate)}")
+
+        if args.details:
+            print("")
+            print(f"Missing (FN, in GT but not Pred): {len(res.missing)}")
+            for p in res.missing:
+                print(f"  - {p}")
+            print("")
+            print(f"Extra (FP, in Pred but not GT): {len(res.extra)}")
+            for p in res.extra:
+                print(f"  - {p}")
+        return 0
+
+    if args.format == "json":
+        print(json.dumps(report_json(report, args.details), indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Repo: {report.repo_root}")
+    print(f"Groundtruth: {report.groundtruth_dir}")
+    print(f"Output: {report.output_root}")
+    print("")
+    print(render_table(report.results, report.totals))
+
+    if args.details:
+        for r in report.results:
+            print("")
+            print(f"== {r.app} ==")
+            print(f"Run: {r.run_dir or '(missing)'}")
+            print(f"Groundtruth: {r.groundtruth_file}")
+            print(f"Missing (FN, in GT but not Pred): {len(r.result.missing)}")
+            for p in r.result.missing:
+                print(f"  - {p}")
+            print(f"Extra (FP, in Pred but not GT): {len(r.result.extra)}")
+            for p in r.result.extra:
+                print(f"  - {p}")
+
+    return 0
@@ -0,0 +1,487 @@
+# -*- coding: utf-8 -*-
+
+# Per-stage resource profile for `npm run analyze`.
+#
+# The command is started as a child process; a sampler reads /proc/<pid>/{stat,io} for the whole
+# process tree (npm -> sh -> tsx/node -> ...) every --interval seconds, and the child's stderr is
+# scanned for `stage=<name>` progress markers (see server/src/app/run.ts). Each marker also forces
+# an immediate sample so stage boundaries are measured rather than interpolated. Everything is
+# read from /proc of our own children, so no root is needed; a sample costs a handful of small
+# reads per process.
+#
+# Outputs:
+#   <out>.json        per-stage profile (wall time, CPU time/utilisation, peak/mean RSS, I/O bytes,
+#                     peak threads/processes) plus the raw samples
+#   <out>.trace.json  Chrome trace events (chrome://tracing, Perfetto, speedscope): stage spans,
+#                     per-process lifetime spans and RSS/CPU counters
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+from oh_eval.common import STAGE_RE, render_rows
+
+CLK_TCK = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+PRE_STAGE = "(启动)"
+
+
+@dataclass
+class ProcSample:
+    comm: str
+    cpu_sec: float
+    rss_bytes: int
+    threads: int
+    read_bytes: int = 0
+    write_bytes: int = 0
+    rchar: int = 0
+    wchar: int = 0
+
+
+def read_proc_sample(pid: int) -> ProcSample | None:
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            raw = f.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    # comm may contain spaces/parens; fields after the last ')' are fixed.
+    lpar, rpar = raw.find("("), raw.rfind(")")
+    fields = raw[rpar + 2 :].split()
+    try:
+        sample = ProcSample(
+            comm=raw[lpar + 1 : rpar],
+            cpu_sec=(int(fields[11]) + int(fields[12])) / CLK_TCK,
+            rss_bytes=int(fields[21]) * PAGE_SIZE,
+            threads=int(fields[17]),
+        )
+    except (IndexError, ValueError):
+        return None
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            io = dict(line.split(b":", 1) for line in f.read().splitlines() if b":" in line)
+        sample.read_bytes = int(io.get(b"read_bytes", b"0"))
+        sample.write_bytes = int(io.get(b"write_bytes", b"0"))
+        sample.rchar = int(io.get(b"rchar", b"0"))
+        sample.wchar = int(io.get(b"wchar", b"0"))
+    except (OSError, ValueError):
+        pass  # /proc/<pid>/io may be unavailable (hardened kernels); keep CPU/RSS.
+    return sample
+
+
+def read_children(pid: int) -> list[int] | None:
+    # Returns None when /proc/<pid>/task/<tid>/children is unsupported so callers can fall back.
+    out: list[int] = []
+    try:
+        tids = os.listdir(f"/proc/{pid}/task")
+    except OSError:
+        return []
+    for tid in tids:
+        try:
+            with open(f"/proc/{pid}/task/{tid}/children", "rb") as f:
+                out.extend(int(x) for x in f.read().split())
+        except FileNotFoundError:
+            if not os.path.exists(f"/proc/{pid}/task/{tid}"):
+                continue
+            return None
+        except (OSError, ValueError):
+            continue
+    return out
+
+
+def scan_parents() -> dict[int, list[int]]:
+    children: dict[int, list[int]] = {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f"/proc/{name}/stat", "rb") as f:
+                raw = f.read().decode("utf-8", "replace")
+            ppid = int(raw[raw.rfind(")") + 2 :].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def list_process_tree(root: int) -> list[int]:
+    pids: list[int] = []
+    stack = [root]
+    by_parent: dict[int, list[int]] | None = None
+    while stack:
+        pid = stack.pop()
+        pids.append(pid)
+        kids = read_children(pid) if by_parent is None else by_parent.get(pid, [])
+        if kids is None:
+            by_parent = scan_parents()
+            kids = by_parent.get(pid, [])
+        stack.extend(kids)
+    return pids
+
+
+@dataclass
+class TreeSample:
+    t: float
+    stage: str
+    processes: int
+    threads: int
+    rss_bytes: int
+    # Cumulative over every process seen so far (exited processes keep their last values).
+    cpu_sec: float
+    read_bytes: int
+    write_bytes: int
+    rchar: int
+    wchar: int
+
+
+@dataclass
+class ProcInfo:
+    pid: int
+    comm: str
+    first_t: float
+    last_t: float
+    peak_rss_bytes: int = 0
+
+
+@dataclass
+class StageProfile:
+    stage: str
+    start_sec: float
+    end_sec: float
+    duration_sec: float
+    samples: int
+    cpu_sec: float
+    cpu_util: float | None  # CPU seconds per wall second (1.0 == one core busy)
+    rss_peak_bytes: int
+    rss_mean_bytes: int
+    read_bytes: int
+    write_bytes: int
+    rchar: int
+    wchar: int
+    threads_peak: int
+    processes_peak: int
+
+
+@dataclass
+class Profile:
+    command: list[str]
+    interval_sec: float
+    started_at: str
+    duration_sec: float
+    exit_code: int | None
+    sampler_cpu_sec: float
+    stages: list[StageProfile] = field(default_factory=list)
+    samples: list[TreeSample] = field(default_factory=list)
+    processes: list[ProcInfo] = field(default_factory=list)
+
+
+class TreeSampler:
+    def __init__(self, root_pid: int, t0: float) -> None:
+        self.root_pid = root_pid
+        self.t0 = t0
+        self.last: dict[int, ProcSample] = {}
+        self.procs: dict[int, ProcInfo] = {}
+        self.samples: list[TreeSample] = []
+
+    def sample(self, stage: str) -> TreeSample:
+        t = round(time.monotonic() - self.t0, 4)
+        rss = threads = live = 0
+        for pid in list_process_tree(self.root_pid):
+            s = read_proc_sample(pid)
+            if s is None:
+                continue
+            live += 1
+            rss += s.rss_bytes
+            threads += s.threads
+            self.last[pid] = s
+            info = self.procs.get(pid)
+            if info is None:
+                info = self.procs[pid] = ProcInfo(pid=pid, comm=s.comm, first_t=t, last_t=t)
+            info.comm = s.comm  # exec() after fork changes comm (sh -> node)
+            info.last_t = t
+            info.peak_rss_bytes = max(info.peak_rss_bytes, s.rss_bytes)
+        totals = self.last.values()
+        out = TreeSample(
+            t=t,
+            stage=stage,
+            processes=live,
+            threads=threads,
+            rss_bytes=rss,
+            cpu_sec=sum(s.cpu_sec for s in totals),
+            read_bytes=sum(s.read_bytes for s in totals),
+            write_bytes=sum(s.write_bytes for s in totals),
+            rchar=sum(s.rchar for s in totals),
+            wchar=sum(s.wchar for s in totals),
+        )
+        self.samples.append(out)
+        return out
+
+
+def summarize_stages(samples: list[TreeSample], markers: list[tuple[float, str]], end_t: float) -> list[StageProfile]:
+    # Stage windows run from one marker to the next. A window is cut at the first sample taken at
+    # or after each boundary (the sampler takes one as soon as it sees a marker), and cumulative
+    # counters (CPU, I/O) are differenced between the two cut samples.
+    if not samples:
+        return []
+    bounds = [(0.0, PRE_STAGE)] + markers
+
+    def cut(t: float) -> int:
+        for i, s in enumerate(samples):
+            if s.t >= t:
+                return i
+        return len(samples) - 1
+
+    out: list[StageProfile] = []
+    for i, (start, stage) in enumerate(bounds):
+        end = bounds[i + 1][0] if i + 1 < len(bounds) else end_t
+        i0 = 0 if i == 0 else cut(start)
+        i1 = cut(end)
+        if i == 0 and end <= samples[0].t:
+            continue
+        s0, s1 = samples[i0], samples[i1]
+        inside = samples[i0 : i1 + 1]
+        duration = max(end - start, 0.0)
+        cpu = s1.cpu_sec - s0.cpu_sec
+        out.append(
+            StageProfile(
+                stage=stage,
+                start_sec=round(start, 3),
+                end_sec=round(end, 3),
+                duration_sec=round(duration, 3),
+                samples=len(inside),
+                cpu_sec=round(cpu, 3),
+                cpu_util=round(cpu / duration, 3) if duration > 0 else None,
+                rss_peak_bytes=max(s.rss_bytes for s in inside),
+                rss_mean_bytes=int(sum(s.rss_bytes for s in inside) / len(inside)),
+                read_bytes=s1.read_bytes - s0.read_bytes,
+                write_bytes=s1.write_bytes - s0.write_bytes,
+                rchar=s1.rchar - s0.rchar,
+                wchar=s1.wchar - s0.wchar,
+                threads_peak=max(s.threads for s in inside),
+                processes_peak=max(s.processes for s in inside),
+            )
+        )
+    return out
+
+
+def has_exited(proc: subprocess.Popen, block: bool = False) -> bool:
+    # Like proc.poll() but without reaping the child (WNOWAIT), so it can still be sampled once more.
+    if not hasattr(os, "waitid"):
+        return (proc.wait() if block else proc.poll()) is not None
+    try:
+        options = os.WEXITED | os.WNOWAIT | (0 if block else os.WNOHANG)
+        return os.waitid(os.P_PID, proc.pid, options) is not None
+    except ChildProcessError:
+        return proc.poll() is not None
+
+
+def exit_status(returncode: int | None) -> int:
+    # Popen reports death by signal N as -N; a shell reports it as 128 + N.
+    if returncode is None:
+        return 0
+    return 128 - returncode if returncode < 0 else returncode
+
+
+def run_profiled(
+    command: list[str],
+    interval_sec: float = 0.5,
+    cwd: str | Path | None = None,
+    stderr_sink=None,
+) -> Profile:
+    started_at = time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    t0 = time.monotonic()
+    cpu0 = time.process_time()
+    proc = subprocess.Popen(command, cwd=cwd, stderr=subprocess.PIPE)
+    sampler = TreeSampler(proc.pid, t0)
+    markers: list[tuple[float, str]] = []
+    wake = threading.Event()
+    sink = stderr_sink if stderr_sink is not None else sys.stderr.buffer
+
+    def pump_stderr() -> None:
+        assert proc.stderr is not None
+        for raw in proc.stderr:
+            sink.write(raw)
+            sink.flush()
+            m = STAGE_RE.search(raw.decode("utf-8", "replace"))
+            if m:
+                markers.append((time.monotonic() - t0, m.group(1)))
+                wake.set()
+
+    def watch_exit() -> None:
+        has_exited(proc, block=True)
+        wake.set()  # sample the exit right away instead of sleeping out the interval
+
+    reader = threading.Thread(target=pump_stderr, daemon=True)
+    reader.start()
+    threading.Thread(target=watch_exit, daemon=True).start()
+
+    stage = PRE_STAGE
+    seen = 0
+    sampler.sample(stage)
+    while not has_exited(proc):
+        if wake.wait(interval_sec):
+            wake.clear()
+            if len(markers) > seen:
+                seen = len(markers)
+                # This sample closes the previous stage; later ones are attributed to the new stage.
+                sampler.sample(stage)
+                stage = markers[-1][1]
+            continue
+        sampler.sample(stage)
+    # The root is a zombie now (not reaped yet), so /proc still has its final CPU/I/O counters; this
+    # sample closes the last stage at the exit time instead of up to one interval earlier.
+    end_t = sampler.sample(stage).t
+    proc.wait()
+    reader.join(timeout=5)
+
+    return Profile(
+        command=command,
+        interval_sec=interval_sec,
+        started_at=started_at,
+        duration_sec=round(end_t, 3),
+        exit_code=proc.returncode,
+        sampler_cpu_sec=round(time.process_time() - cpu0, 3),
+        stages=summarize_stages(sampler.samples, markers, end_t),
+        samples=sampler.samples,
+        processes=sorted(sampler.procs.values(), key=lambda p: p.first_t),
+    )
+
+
+def to_camel(name: str) -> str:
+    head, *rest = name.split("_")
+    return head + "".join(w[:1].upper() + w[1:] for w in rest)
+
+
+def camel_dict(value: object) -> object:
+    if isinstance(value, dict):
+        return {to_camel(k): camel_dict(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [camel_dict(v) for v in value]
+    return value
+
+
+def profile_json(profile: Profile) -> dict:
+    return camel_dict(asdict(profile))  # type: ignore[return-value]
+
+
+def trace_json(profile: Profile) -> dict:
+    us = 1_000_000
+    pid = profile.processes[0].pid if profile.processes else 0
+    events: list[dict] = [
+        {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": " ".join(profile.command)}},
+        {"name": "thread_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": "stages"}},
+    ]
+    for st in profile.stages:
+        events.append(
+            {
+                "name": st.stage,
+                "cat": "stage",
+                "ph": "X",
+                "ts": int(st.start_sec * us),
+                "dur": max(int(st.duration_sec * us), 1),
+                "pid": pid,
+                "tid": 0,
+                "args": {k: v for k, v in camel_dict(asdict(st)).items() if k != "stage"},
+            }
+        )
+    for p in profile.processes:
+        events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": p.pid, "args": {"name": f"{p.comm} ({p.pid})"}})
+        events.append(
+            {
+                "name": p.comm,
+                "cat": "process",
+                "ph": "X",
+                "ts": int(p.first_t * us),
+                "dur": max(int((p.last_t - p.first_t) * us), 1),
+                "pid": pid,
+                "tid": p.pid,
+                "args": {"peakRssBytes": p.peak_rss_bytes},
+            }
+        )
+    prev: TreeSample | None = None
+    for s in profile.samples:
+        ts = int(s.t * us)
+        events.append({"name": "rss", "ph": "C", "ts": ts, "pid": pid, "args": {"MB": round(s.rss_bytes / 2**20, 1)}})
+        events.append({"name": "threads", "ph": "C", "ts": ts, "pid": pid, "args": {"threads": s.threads}})
+        if prev is not None and s.t > prev.t:
+            util = (s.cpu_sec - prev.cpu_sec) / (s.t - prev.t)
+            events.append({"name": "cpu", "ph": "C", "ts": ts, "pid": pid, "args": {"cores": round(util, 2)}})
+        prev = s
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def fmt_mb(v: int) -> str:
+    return f"{v / 2**20:.1f}"
+
+
+def render_stage_table(stages: list[StageProfile]) -> str:
+    headers = ["Stage", "Wall(s)", "CPU(s)", "CPU/Wall", "PeakRSS(MB)", "Read(MB)", "Write(MB)", "Threads", "Samples"]
+    rows = [
+        [
+            s.stage,
+            f"{s.duration_sec:.2f}",
+            f"{s.cpu_sec:.2f}",
+            "/" if s.cpu_util is None else f"{s.cpu_util:.2f}",
+            fmt_mb(s.rss_peak_bytes),
+            fmt_mb(s.read_bytes),
+            fmt_mb(s.write_bytes),
+            str(s.threads_peak),
+            str(s.samples),
+        ]
+        for s in stages
+    ]
+
+    return render_rows(headers, rows)
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    from oh_eval.common import find_repo_root
+
+    parser = argparse.ArgumentParser(
+        description="Run `npm run analyze -- <args>` and record a per-stage CPU/RSS/IO profile of its process tree (Linux /proc, no root needed).",
+        usage="%(prog)s [options] -- <analyze args...>",
+    )
+    parser.add_argument("--interval", type=float, default=0.5, help="Sampling interval in seconds (default: 0.5)")
+    parser.add_argument("--out", default="", help="Profile path prefix (default: output/_profiles/analyze-<timestamp>)")
+    parser.add_argument("--exec", dest="exec_cmd", action="store_true", help="Treat the trailing args as a full command instead of analyze args")
+    parser.add_argument("rest", nargs=argparse.REMAINDER, help="Arguments passed to `npm run analyze --` (or the command with --exec)")
+    args = parser.parse_args(argv)
+
+    rest = args.rest[1:] if args.rest[:1] == ["--"] else args.rest
+    if not sys.platform.startswith("linux"):
+        raise RuntimeError("profile_analyze.py needs Linux /proc")
+    if args.interval <= 0:
+        raise ValueError("--interval must be > 0")
+    if args.exec_cmd and not rest:
+        raise ValueError("--exec requires a command")
+    command = rest if args.exec_cmd else ["npm", "run", "analyze", "--", *rest]
+
+    repo_root = find_repo_root(Path.cwd())
+    out_prefix = Path(args.out) if args.out else repo_root / "output" / "_profiles" / f"analyze-{time.strftime('%Y%m%d-%H%M%S')}"
+    out_prefix.parent.mkdir(parents=True, exist_ok=True)
+
+    profile = run_profiled(command, args.interval, cwd=repo_root if not args.exec_cmd else None)
+
+    profile_path = out_prefix.with_name(out_prefix.name + ".json")
+    trace_path = out_prefix.with_name(out_prefix.name + ".trace.json")
+    profile_path.write_text(json.dumps(profile_json(profile), indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    trace_path.write_text(json.dumps(trace_json(profile), ensure_ascii=False) + "\n", encoding="utf-8")
+
+    print("", file=sys.stderr)
+    print(render_stage_table(profile.stages), file=sys.stderr)
+    print("", file=sys.stderr)
+    print(
+        f"Exit: {profile.exit_code}  Wall: {profile.duration_sec:.2f}s  Samples: {len(profile.samples)}  Sampler CPU: {profile.sampler_cpu_sec:.3f}s",
+        file=sys.stderr,
+    )
+    print(f"Profile: {profile_path}", file=sys.stderr)
+    print(f"Trace: {trace_path}", file=sys.stderr)
+    return exit_status(profile.exit_code)
@@ -0,0 +1,500 @@
+# -*- coding: utf-8 -*-
+
+# How much of the LLM dataflow stage is repeated work?
+#
+# The dataflow stage issues one sequential LLM call per call-graph path and the model describes every
+# node on that path, so nodes shared by many flows (aboutToAppear / logTag / domainId ...) are
+# described again and again. For every run this module hash-conses the flow nodes of dataflows.json
+# on (filePath, line, code) and inserts each flow's node-id sequence into a trie, in flow order
+# (the order the analyzer requested them). From that it reports:
+#   - total vs unique nodes, and the trie size (nodes left to describe if whole prefixes are reused);
+#   - the shared-prefix depth of each flow (longest prefix already seen in an earlier flow);
+#   - projected LLM calls and dataflow-stage latency if descriptions were memoized
+#       per node   : a node already described is reused wherever it recurs,
+#       per prefix : a flow only describes the suffix after its longest already-described prefix;
+#     a flow whose nodes are all reused needs no call at all.
+#
+# Latency is projected with a linear model seconds = calls * callSec + nodes * nodeSec, fitted on
+# the measured dataflow stage durations found in output/_batch_full_analysis_*.log (override with
+# --call-sec / --node-sec). Runs with a measured duration are scaled from that measurement.
+
+from __future__ import annotations
+
+import json
+import re
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+from oh_eval.common import (
+    STAGE_RE,
+    as_int,
+    iter_run_dirs,
+    normalize_path,
+    read_json_or_none,
+    render_rows,
+    resolve_repo_root,
+    resolve_under,
+)
+
+DATAFLOW_STAGE = "生成数据流（LLM）"
+BATCH_LOG_GLOB = "_batch_full_analysis_*.log"
+DEPTH_BUCKETS = ((0, 0), (1, 1), (2, 2), (3, 4), (5, 9), (10, None))
+
+LOG_LINE_RE = re.compile(r"^\[(?P<ts>[^\]]+)\] (?P<event>[\w-]+)(?P<rest>.*)$")
+APP_RE = re.compile(r"\bapp=(\S+)")
+RUN_ID_RE = re.compile(r"\brunId=(\S+)")
+
+NodeKey = tuple[str, int, str]
+
+
+def parse_timestamp(text: str) -> float | None:
+    try:
+        return datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def load_stage_durations(output_root: Path) -> dict[str, dict[str, float]]:
+    # runId -> stage -> seconds, from the batch logs written by the analyze runner:
+    #   [ts] app-start ... app=<app>
+    #   [ts] app-progress app=<app> percent=<p> stage=<stage>
+    #   [ts] app-done app=<app> runId=<runId> ...
+    # A stage lasts until the next progress line (or app-done) of the same app.
+    durations: dict[str, dict[str, float]] = {}
+    for log_file in sorted(output_root.glob(BATCH_LOG_GLOB)):
+        pending: dict[str, list[tuple[float, str]]] = {}
+        try:
+            lines = log_file.read_text(encoding="utf-8", errors="replace").splitlines()
+        except OSError:
+            continue
+        for line in lines:
+            m = LOG_LINE_RE.match(line)
+            app_m = APP_RE.search(line)
+            if not m or not app_m:
+                continue
+            t = parse_timestamp(m.group("ts"))
+            if t is None:
+                continue
+            event, app = m.group("event"), app_m.group(1)
+            if event == "app-start":
+                pending[app] = []
+            elif event == "app-progress":
+                stage_m = STAGE_RE.search(line)
+                if stage_m:
+                    pending.setdefault(app, []).append((t, stage_m.group(1)))
+            elif event == "app-done":
+                run_m = RUN_ID_RE.search(line)
+                marks = pending.pop(app, [])
+                if not run_m or not marks:
+                    continue
+                stages: dict[str, float] = {}
+                for (start, stage), end in zip(marks, [m[0] for m in marks[1:]] + [t]):
+                    stages[stage] = stages.get(stage, 0.0) + max(0.0, end - start)
+                durations[run_m.group(1)] = stages
+    return durations
+
+
+def node_key(node: dict) -> NodeKey | None:
+    file_path = normalize_path(node.get("filePath"))
+    line = as_int(node.get("line"))
+    if not file_path or line is None:
+        return None
+    return (file_path, line, " ".join(str(node.get("code") or "").split()))
+
+
+def load_flow_sequences(dataflows_file: Path) -> list[list[NodeKey]]:
+    parsed = read_json_or_none(dataflows_file)
+    flows = parsed.get("flows") if isinstance(parsed, dict) else None
+    out: list[list[NodeKey]] = []
+    for flow in flows if isinstance(flows, list) else []:
+        nodes = flow.get("nodes") if isinstance(flow, dict) else None
+        keys = [node_key(n) for n in nodes if isinstance(n, dict)] if isinstance(nodes, list) else []
+        out.append([k for k in keys if k is not None])
+    return out
+
+
+@dataclass
+class PathTrie:
+    # Nodes are hash-consed to small ints; the trie is a flat (parent, nodeId) -> child map so that
+    # every distinct prefix is stored (and would be described) exactly once. Trie node 0 is the root.
+    node_ids: dict[NodeKey, int] = field(default_factory=dict)
+    node_counts: Counter = field(default_factory=Counter)
+    children: dict[tuple[int, int], int] = field(default_factory=dict)
+
+    def intern(self, key: NodeKey) -> int:
+        self.node_counts[key] += 1
+        return self.node_ids.setdefault(key, len(self.node_ids))
+
+    def insert(self, ids: list[int]) -> int:
+        # Returns the depth of the longest prefix that was already present.
+        cur = 0
+        shared = 0
+        for i, node_id in enumerate(ids):
+            child = self.children.get((cur, node_id))
+            if child is None:
+                child = len(self.children) + 1
+                self.children[(cur, node_id)] = child
+            elif shared == i:
+                shared = i + 1
+            cur = child
+        return shared
+
+
+@dataclass(frozen=True)
+class RunRedundancy:
+    app: str
+    run: str
+    run_id: str
+    flows: int
+    nodes: int
+    unique_nodes: int
+    trie_nodes: int
+    node_memo_calls: int
+    prefix_memo_calls: int
+    fully_shared_flows: int
+    prefix_depths: dict[int, int]
+    top_nodes: list[tuple[NodeKey, int]]
+    dataflow_sec: float | None
+
+
+def analyze_flows(sequences: list[list[NodeKey]], top: int = 10) -> dict:
+    trie = PathTrie()
+    seen: set[int] = set()
+    depths: Counter = Counter()
+    node_memo_calls = 0
+    prefix_memo_calls = 0
+    fully_shared = 0
+    total = 0
+    for seq in sequences:
+        ids = [trie.intern(k) for k in seq]
+        total += len(ids)
+        shared = trie.insert(ids)
+        depths[shared] += 1
+        if ids and shared == len(ids):
+            fully_shared += 1
+        else:
+            prefix_memo_calls += 1
+        if not ids or not seen.issuperset(ids):
+            node_memo_calls += 1
+        seen.update(ids)
+    return {
+        "flows": len(sequences),
+        "nodes": total,
+        "unique_nodes": len(trie.node_ids),
+        "trie_nodes": len(trie.children),
+        "node_memo_calls": node_memo_calls,
+        "prefix_memo_calls": prefix_memo_calls,
+        "fully_shared_flows": fully_shared,
+        "prefix_depths": dict(sorted(depths.items())),
+        "top_nodes": [(k, n) for k, n in trie.node_counts.most_common(top) if n > 1],
+    }
+
+
+def analyze_run(app: str, run_dir: Path, durations: dict[str, dict[str, float]], top: int = 10) -> RunRedundancy:
+    meta = read_json_or_none(run_dir / "meta.json")
+    run_id = str(meta.get("runId") or "") if isinstance(meta, dict) else ""
+    run_id = run_id or f"{app}_{run_dir.name}"
+    stats = analyze_flows(load_flow_sequences(run_dir / "dataflows.json"), top=top)
+    return RunRedundancy(
+        app=app, run=run_dir.name, run_id=run_id, dataflow_sec=durations.get(run_id, {}).get(DATAFLOW_STAGE), **stats
+    )
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    call_sec: float
+    node_sec: float
+    fitted_runs: int  # 0 when given explicitly or no measured run was available
+
+    def cost(self, calls: int, nodes: int) -> float:
+        return calls * self.call_sec + nodes * self.node_sec
+
+
+def fit_latency_model(runs: Iterable[RunRedundancy]) -> LatencyModel | None:
+    # Least squares for seconds = calls * a + nodes * b (no intercept) over runs with a measured
+    # dataflow stage; falls back to the better single-term fit when a or b would come out negative.
+    samples = [(r.flows, r.nodes, r.dataflow_sec) for r in runs if r.dataflow_sec and r.flows > 0]
+    if not samples:
+        return None
+    scc = sum(c * c for c, _, _ in samples)
+    snn = sum(n * n for _, n, _ in samples)
+    scn = sum(c * n for c, n, _ in samples)
+    sct = sum(c * t for c, _, t in samples)
+    snt = sum(n * t for _, n, t in samples)
+    det = scc * snn - scn * scn
+    if det > 0:
+        a = (sct * snn - snt * scn) / det
+        b = (snt * scc - sct * scn) / det
+        if a >= 0 and b >= 0:
+            return LatencyModel(a, b, len(samples))
+
+    def residual(a: float, b: float) -> float:
+        return sum((t - c * a - n * b) ** 2 for c, n, t in samples)
+
+    # A term with no data (e.g. flows measured but no keyable nodes) cannot be fitted on its own.
+    candidates = []
+    if scc > 0:
+        candidates.append(LatencyModel(sct / scc, 0.0, len(samples)))
+    if snn > 0:
+        candidates.append(LatencyModel(0.0, snt / snn, len(samples)))
+    if not candidates:
+        return None
+    return min(candidates, key=lambda m: residual(m.call_sec, m.node_sec))
+
+
+@dataclass(frozen=True)
+class Projection:
+    calls: int
+    nodes: int
+    seconds: float | None
+
+
+def project(run: RunRedundancy, model: LatencyModel | None) -> dict[str, Projection]:
+    plans = {
+        "baseline": (run.flows, run.nodes),
+        "nodeMemo": (run.node_memo_calls, run.unique_nodes),
+        "prefixMemo": (run.prefix_memo_calls, run.trie_nodes),
+    }
+    base_cost = model.cost(run.flows, run.nodes) if model else 0.0
+    out: dict[str, Projection] = {}
+    for name, (calls, nodes) in plans.items():
+        seconds = None
+        if model is not None:
+            seconds = model.cost(calls, nodes)
+            if run.dataflow_sec is not None and base_cost > 0:
+                # Anchor on the measurement; the model only supplies the relative saving.
+                seconds = run.dataflow_sec * seconds / base_cost
+        out[name] = Projection(calls, nodes, seconds)
+    return out
+
+
+@dataclass(frozen=True)
+class RedundancyReport:
+    repo_root: Path
+    output_root: Path
+    runs: list[RunRedundancy]
+    model: LatencyModel | None
+
+
+def analyze_redundancy(
+    *,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    apps: Iterable[str] | None = None,
+    latest_only: bool = False,
+    call_sec: float | None = None,
+    node_sec: float | None = None,
+    top: int = 10,
+) -> RedundancyReport:
+    root = resolve_repo_root(repo_root)
+    out_root = resolve_under(root, output_root)
+    only = set(apps) if apps else None
+    durations = load_stage_durations(out_root)
+
+    # Every run feeds the latency fit (measured runs are rarely the latest ones); filters only
+    # select which runs are reported.
+    all_runs = [analyze_run(app, d, durations, top=top) for app, d in iter_run_dirs(out_root)]
+    runs = [r for r in all_runs if only is None or r.app in only]
+    if latest_only:
+        latest: dict[str, RunRedundancy] = {}
+        for r in runs:
+            latest[r.app] = r  # iter_run_dirs is sorted, so the last one per app is the latest
+        runs = list(latest.values())
+
+    model = fit_latency_model(all_runs)
+    if call_sec is not None or node_sec is not None:
+        model = LatencyModel(
+            call_sec if call_sec is not None else (model.call_sec if model else 0.0),
+            node_sec if node_sec is not None else (model.node_sec if model else 0.0),
+            0,
+        )
+    return RedundancyReport(repo_root=root, output_root=out_root, runs=runs, model=model)
+
+
+def bucket_depths(depths: dict[int, int]) -> dict[str, int]:
+    out: dict[str, int] = {}
+    for lo, hi in DEPTH_BUCKETS:
+        label = str(lo) if lo == hi else (f"{lo}+" if hi is None else f"{lo}-{hi}")
+        out[label] = sum(n for d, n in depths.items() if d >= lo and (hi is None or d <= hi))
+    return out
+
+
+def merge_depths(runs: Iterable[RunRedundancy]) -> dict[int, int]:
+    total: Counter = Counter()
+    for r in runs:
+        total.update(r.prefix_depths)
+    return dict(sorted(total.items()))
+
+
+def total_projection(runs: list[RunRedundancy], model: LatencyModel | None) -> dict[str, Projection]:
+    out: dict[str, Projection] = {}
+    for r in runs:
+        for name, p in project(r, model).items():
+            prev = out.get(name)
+            if prev is None:
+                out[name] = p
+                continue
+            seconds = None if prev.seconds is None or p.seconds is None else prev.seconds + p.seconds
+            out[name] = Projection(prev.calls + p.calls, prev.nodes + p.nodes, seconds)
+    return out
+
+
+def fmt_sec(v: float | None) -> str:
+    return "/" if v is None else f"{v:.0f}"
+
+
+def fmt_share(part: float, whole: float) -> str:
+    return "/" if not whole else f"{part / whole * 100:.1f}%"
+
+
+def projection_json(p: Projection, base: Projection) -> dict:
+    return {
+        "calls": p.calls,
+        "nodes": p.nodes,
+        "seconds": None if p.seconds is None else round(p.seconds, 1),
+        "savedCalls": base.calls - p.calls,
+        "savedNodes": base.nodes - p.nodes,
+        "savedSeconds": None if p.seconds is None or base.seconds is None else round(base.seconds - p.seconds, 1),
+    }
+
+
+def projections_json(projections: dict[str, Projection]) -> dict:
+    base = projections["baseline"]
+    return {name: projection_json(p, base) for name, p in projections.items()}
+
+
+def run_json(run: RunRedundancy, model: LatencyModel | None) -> dict:
+    return {
+        "app": run.app,
+        "run": run.run,
+        "runId": run.run_id,
+        "flows": run.flows,
+        "nodes": run.nodes,
+        "uniqueNodes": run.unique_nodes,
+        "trieNodes": run.trie_nodes,
+        "fullySharedFlows": run.fully_shared_flows,
+        "measuredDataflowSec": None if run.dataflow_sec is None else round(run.dataflow_sec, 1),
+        "prefixDepths": {str(d): n for d, n in run.prefix_depths.items()},
+        "projection": projections_json(project(run, model)),
+        "topNodes": [{"filePath": k[0], "line": k[1], "code": k[2], "count": n} for k, n in run.top_nodes],
+    }
+
+
+def report_json(report: RedundancyReport) -> dict:
+    model = report.model
+    return {
+        "repoRoot": str(report.repo_root),
+        "outputRoot": str(report.output_root),
+        "latencyModel": None
+        if model is None
+        else {
+            "callSec": round(model.call_sec, 3),
+            "nodeSec": round(model.node_sec, 3),
+            "fittedRuns": model.fitted_runs,
+        },
+        "runs": [run_json(r, model) for r in report.runs],
+        "total": {
+            "runs": len(report.runs),
+            "flows": sum(r.flows for r in report.runs),
+            "nodes": sum(r.nodes for r in report.runs),
+            "uniqueNodes": sum(r.unique_nodes for r in report.runs),
+            "trieNodes": sum(r.trie_nodes for r in report.runs),
+            "prefixDepths": {str(d): n for d, n in merge_depths(report.runs).items()},
+            "projection": projections_json(total_projection(report.runs, model)),
+        },
+    }
+
+
+def render_report(report: RedundancyReport, details: bool = False) -> str:
+    headers = [
+        "App", "Run", "Flows", "Nodes", "Unique", "Trie",
+        "Calls(node)", "Calls(prefix)", "Dataflow(s)", "Saved(node)", "Saved(prefix)",
+    ]
+
+    def row(label: str, run: str, flows: int, nodes: int, unique: int, trie: int, proj: dict[str, Projection]) -> list[str]:
+        base, node, prefix = proj["baseline"], proj["nodeMemo"], proj["prefixMemo"]
+
+        def saved(p: Projection) -> str:
+            if p.seconds is None or base.seconds is None:
+                return "/"
+            return f"{base.seconds - p.seconds:.0f}s ({fmt_share(base.seconds - p.seconds, base.seconds)})"
+
+        return [
+            label, run, str(flows), str(nodes),
+            f"{unique} ({fmt_share(unique, nodes)})", f"{trie} ({fmt_share(trie, nodes)})",
+            str(node.calls), str(prefix.calls), fmt_sec(base.seconds), saved(node), saved(prefix),
+        ]
+
+    runs = [r for r in report.runs if r.flows > 0]
+    rows = [row(r.app, r.run, r.flows, r.nodes, r.unique_nodes, r.trie_nodes, project(r, report.model)) for r in runs]
+    rows.append(row(
+        "TOTAL", f"{len(runs)} runs",
+        sum(r.flows for r in runs), sum(r.nodes for r in runs),
+        sum(r.unique_nodes for r in runs), sum(r.trie_nodes for r in runs),
+        total_projection(runs, report.model),
+    ))
+    lines = [render_rows(headers, rows)]
+
+    skipped = len(report.runs) - len(runs)
+    if skipped:
+        lines.append(f"({skipped} run(s) without dataflows omitted)")
+
+    model = report.model
+    if model is None:
+        lines.append("Latency model: none (no measured dataflow stage; pass --call-sec/--node-sec)")
+    else:
+        source = f"fitted on {model.fitted_runs} measured run(s)" if model.fitted_runs else "given"
+        lines.append(f"Latency model: {model.call_sec:.2f}s/call + {model.node_sec:.2f}s/node ({source})")
+
+    depths = merge_depths(runs)
+    flows = sum(depths.values())
+    lines.append("")
+    lines.append("Shared-prefix depth (flows whose first N nodes were already seen in an earlier flow):")
+    for label, n in bucket_depths(depths).items():
+        lines.append(f"  {label:>4}: {n:>6} ({fmt_share(n, flows)})")
+
+    if details:
+        for r in runs:
+            if not r.top_nodes:
+                continue
+            lines.append("")
+            lines.append(f"[{r.app} {r.run}] most repeated nodes:")
+            for (file_path, line, code), n in r.top_nodes:
+                lines.append(f"  {n:>5}x  {file_path}:{line}  {code[:80]}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Quantify prefix-shared / repeated nodes in dataflows.json and project LLM memoization savings.",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--output-root", default="output", help="Output root dir (default: output)")
+    parser.add_argument("--app", action="append", default=[], help="Only this app (repeatable)")
+    parser.add_argument("--latest", action="store_true", help="Only the latest run per app")
+    parser.add_argument("--call-sec", type=float, default=None, help="Seconds per LLM call (default: fitted)")
+    parser.add_argument("--node-sec", type=float, default=None, help="Seconds per described node (default: fitted)")
+    parser.add_argument("--top", type=int, default=10, help="Most repeated nodes to keep per run (default: 10)")
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    parser.add_argument("--details", action="store_true", help="Print the most repeated nodes per run")
+    args = parser.parse_args(argv)
+
+    report = analyze_redundancy(
+        repo_root=args.repo_root or None,
+        output_root=args.output_root,
+        apps=args.app or None,
+        latest_only=args.latest,
+        call_sec=args.call_sec,
+        node_sec=args.node_sec,
+        top=args.top,
+    )
+    if args.format == "json":
+        print(json.dumps(report_json(report), indent=2, ensure_ascii=False))
+    else:
+        print(render_report(report, details=args.details))
+    return 0
@@ -0,0 +1,1475 @@
+# -*- coding: utf-8 -*-
+
+# Offline page/feature re-aggregation of an existing run, without any LLM call.
+#
+# Python port of groupDataflowsByPageFeature (server/src/analyzer/feature/group.ts): loads the run's
+# ui_tree.json, dataflows.json and sources.json, indexes UI nodes by file/line and assigns every
+# flow to a page and a feature, then writes a fresh pages/ tree (pages/index.json,
+# pages/<pageId>/ui_tree.json, pages/<pageId>/features/index.json,
+# pages/<pageId>/features/<featureId>/dataflows.json) plus meta.json with updated page counts into
+# a NEW directory, together with regroup_diff.json comparing flow -> feature assignments against
+# the run's original pages/ tree.
+#
+# build() ranges and handler names need the app sources. They are read from the repo (input/app/...)
+# when present; otherwise the file is reconstructed from the context snippets stored in ui_tree.json
+# and dataflows.json (unknown lines left empty), and blocks whose braces fall into a gap are closed
+# by indentation. The "sources" column/field reports which mode each run used.
+#
+# Orderings follow the TS localeCompare() calls: with PyICU installed the zh-Hans-CN collator is used,
+# otherwise an approximation (punctuation < digits < letters, case-insensitive), which can only
+# change the order of entries in the index files, never the assignments.
+#
+# Mirrors the TS files at the git blob ids in MIRRORED_SOURCES (`git hash-object <file>`). After
+# changing either file, port the change here, run `regroup_pages.py --check` (non-zero exit when a
+# run's regrouping differs from its original pages/ tree, or when a mirrored file has changed since
+# the recorded blob) and update the ids.
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import sys
+import time
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
+
+from oh_eval.common import (
+    as_dicts,
+    find_latest_run_dir,
+    iter_feature_dirs,
+    iter_run_dirs,
+    read_json_or_none,
+    render_rows,
+    resolve_repo_root,
+    resolve_run_dir,
+    resolve_under,
+)
+
+MIRRORED_SOURCES = {
+    "server/src/analyzer/feature/group.ts": "d70ea29c48f7c0ca1a311e8d2f5ca9d5c0137143",
+    "server/src/analyzer/feature/ui.ts": "fda52140188b07da3b18655244b7cdc33899a81b",
+}
+DEFAULT_OUT = "output/_regroup"
+DIFF_FILE = "regroup_diff.json"
+MAX_UI_DISTANCE_STRICT = 80
+MAX_UI_DISTANCE_FALLBACK = 160
+UI_CATEGORY_PENALTY = {"Button": 0, "Input": 2, "Component": 4, "Display": 6}
+OTHER_CATEGORY_PENALTY = 8
+
+PAGE_SEGMENT_MAP = {
+    "index": "首页",
+    "home": "首页",
+    "main": "首页",
+    "entry": "首页",
+    "chat": "聊天",
+    "message": "聊天",
+    "messages": "聊天",
+    "contact": "通讯录",
+    "contacts": "通讯录",
+    "addressbook": "通讯录",
+    "discover": "发现",
+    "find": "发现",
+    "moment": "朋友圈",
+    "moments": "朋友圈",
+    "timeline": "朋友圈",
+    "mine": "我的",
+    "me": "我",
+    "my": "我的",
+    "profile": "我的",
+    "setting": "设置",
+    "settings": "设置",
+    "search": "搜索",
+    "login": "登录",
+    "register": "注册",
+    "qrcode": "二维码",
+    "qr": "二维码",
+    "scan": "扫一扫",
+}
+
+ENTRY_ABILITY_TITLES = {
+    "onCreate": "应用创建时",
+    "onDestroy": "应用退出时",
+    "onForeground": "应用切到前台时",
+    "onBackground": "应用切到后台时",
+    "onWindowStageCreate": "主窗口创建时",
+    "onWindowStageDestroy": "主窗口销毁时",
+    "onWindowStageActive": "主窗口激活时",
+    "onWindowStageInactive": "主窗口失焦时",
+    "onNewWant": "收到新请求时",
+    "onConfigurationUpdate": "系统配置更新时",
+}
+COMPONENT_TITLES = {
+    "build": "组件展示与交互",
+    "aboutToAppear": "组件显示时",
+    "aboutToDisappear": "组件隐藏前",
+    "onBackPress": "组件返回处理",
+}
+PAGE_TITLE_SUFFIXES = {
+    "build": "展示与交互",
+    "aboutToAppear": "进入时",
+    "aboutToDisappear": "离开前",
+    "onPageShow": "显示时",
+    "onPageHide": "隐藏时",
+    "onBackPress": "返回处理",
+}
+
+CJK_RE = re.compile(r"[一-鿿]")
+# JS \w / \b are ASCII-only, hence re.ASCII wherever they are ported.
+NON_ID_RE = re.compile(r"[^\w-]+", re.ASCII)
+METHOD_NAME_BLACKLIST = frozenset(
+    ("if", "for", "while", "switch", "catch", "return", "typeof", "instanceof", "new", "delete")
+)
+FUNCTION_RES = (
+    (re.compile(r"^\s*function\s+([A-Za-z_][A-Za-z0-9_]*)\s*\(", re.M), "function"),
+    (re.compile(r"^\s*(?:const|let|var\s+)?([A-Za-z_][A-Za-z0-9_]*)\s*=\s*(?:async\s*)?\(", re.M), "arrowAssign"),
+    (
+        re.compile(
+            r"^\s*(?:(?:public|private|protected|async|static|readonly|abstract|override)\s+)*"
+            r"([A-Za-z_][A-Za-z0-9_]*|constructor)\s*(?:<[^>\n]+>)?\s*\(",
+            re.M,
+        ),
+        "method",
+    ),
+)
+
+
+# ---------------------------------------------------------------------------------------------
+# JS semantics helpers
+
+
+def js_number(value: object, default: int | float = 0) -> int | float:
+    # `Number(value) || default`
+    if isinstance(value, bool):
+        n: float = int(value)
+    elif isinstance(value, (int, float)):
+        n = value
+    elif isinstance(value, str):
+        try:
+            n = float(value.strip()) if value.strip() else 0
+        except ValueError:
+            n = 0
+    else:
+        n = 0
+    if n != n or n == 0:
+        return default
+    return int(n) if math.isfinite(n) and float(n).is_integer() else n
+
+
+def js_str(value: object) -> str:
+    # String(value) for the scalars that end up in lookup keys.
+    if value is None:
+        return "undefined"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def is_number(value: object) -> bool:
+    # typeof value === 'number'
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@lru_cache(maxsize=None)
+def icu_collator(locale: str):
+    try:
+        import icu  # PyICU, optional
+    except ImportError:
+        return None
+    return icu.Collator.createInstance(icu.Locale(locale))
+
+
+def collation_key(text: str, locale: str = "root") -> object:
+    collator = icu_collator(locale)
+    if collator is not None:
+        return collator.getSortKey(text)
+    primary = []
+    tertiary = []
+    for ch in text:
+        if ch.isdigit():
+            primary.append((1, ord(ch)))
+        elif ch.isalpha() and ch.isascii():
+            primary.append((2, ord(ch.lower())))
+        elif ch.isascii():
+            primary.append((0, ord(ch)))
+        else:
+            primary.append((3, ord(ch)))
+        tertiary.append(0 if not ch.isupper() else 1)
+    return (primary, tertiary)
+
+
+def sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def iso_now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def drop_none(d: dict) -> dict:
+    # JSON.stringify drops undefined members.
+    return {k: v for k, v in d.items() if v is not None}
+
+
+# ---------------------------------------------------------------------------------------------
+# Titles / ids (group.ts, ui.ts)
+
+
+def has_cjk(text: str) -> bool:
+    return bool(CJK_RE.search(text))
+
+
+def sanitize_id(text: str) -> str:
+    raw = NON_ID_RE.sub("_", text)
+    raw = re.sub(r"^_+|_+$", "", raw)
+    return re.sub(r"_+", "_", raw)
+
+
+def path_base_name(file_path: str) -> str:
+    last = file_path.split("/")[-1]
+    return re.sub(r"\.[^.]+$", "", last)
+
+
+def build_page_id(struct_name: str | None, file_path: str, used: set[str]) -> str:
+    base_name = struct_name.strip() if struct_name and struct_name.strip() else (path_base_name(file_path) or "page")
+    base = sanitize_id(base_name) or "page"
+    if base not in used:
+        used.add(base)
+        return base
+    full = f"{base}_{sha1(file_path)[:8]}"
+    used.add(full)
+    return full
+
+
+def normalize_path_for_match(file_path: str) -> str:
+    return file_path.replace("\\", "/").lower()
+
+
+def is_component_file(file_path: str) -> bool:
+    return re.search(r"(?:^|/)component/", normalize_path_for_match(file_path)) is not None
+
+
+def is_entry_ability_file(file_path: str) -> bool:
+    return re.search(r"(?:^|/)entryability/", normalize_path_for_match(file_path)) is not None
+
+
+def normalize_short_title(text: str) -> str:
+    title = re.sub(r"\s+", " ", text).strip()
+    title = re.sub(r"[“”\"]", "", title)
+    title = re.sub(r"[’']", "", title)
+    title = re.sub(r"\s*[）)]", "）", re.sub(r"[（(]\s*", "（", title))
+    title = re.sub(r"\s+", "", title)
+    title = re.sub(r"[：:，,。.!！？?]+$", "", re.sub(r"^[：:，,。.!！？?]+", "", title))
+    return title
+
+
+def strip_ts_ext(name: str) -> str:
+    return re.sub(r"\.(ets|ts|tsx|js|jsx)$", "", name)
+
+
+def strip_common_page_suffix(name: str) -> str:
+    return re.sub(r"(Page|View|Screen|Ability)$", "", name)
+
+
+def humanize_english_token(token: str) -> str:
+    raw = token.strip()
+    if not raw:
+        return ""
+    if raw.lower() in PAGE_SEGMENT_MAP:
+        return PAGE_SEGMENT_MAP[raw.lower()]
+    parts = [p for p in re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", raw).split() if p]
+    if len(parts) <= 1:
+        return ""
+    return "".join(PAGE_SEGMENT_MAP[p.lower()] for p in parts if PAGE_SEGMENT_MAP.get(p.lower()))
+
+
+def ensure_page_suffix(title: str) -> str:
+    value = title.strip()
+    if not value or value == "首页" or re.search(r"(页|页面|界面|主页)$", value):
+        return value
+    return f"{value}页面"
+
+
+def infer_page_base_title_from_path(file_path: str) -> str:
+    segments = [s for s in file_path.replace("\\", "/").split("/") if s]
+    lower = [strip_ts_ext(s).lower() for s in segments]
+    pages_idx = len(lower) - 1 - lower[::-1].index("pages") if "pages" in lower else -1
+    after = segments[pages_idx + 1 :] if pages_idx >= 0 else segments
+    clean = [strip_common_page_suffix(strip_ts_ext(s)) for s in after]
+    last = clean[-1] if clean else ""
+    penultimate = clean[-2] if len(clean) >= 2 else ""
+    for candidate in (c for c in (last, penultimate) if c):
+        if has_cjk(candidate):
+            return candidate
+        translated = humanize_english_token(candidate)
+        if translated:
+            return translated
+        if PAGE_SEGMENT_MAP.get(candidate.lower()):
+            return PAGE_SEGMENT_MAP[candidate.lower()]
+    for segment in reversed(clean):
+        if PAGE_SEGMENT_MAP.get(segment.lower()):
+            return PAGE_SEGMENT_MAP[segment.lower()]
+    return last or "页面"
+
+
+def infer_page_title(file_path: str | None, struct_name: str | None) -> str:
+    file_path = (file_path or "").strip()
+    struct_name = (struct_name or "").strip()
+    base = infer_page_base_title_from_path(file_path) if file_path else ""
+    if not base and struct_name:
+        stripped = strip_common_page_suffix(struct_name)
+        base = (
+            stripped
+            if has_cjk(stripped)
+            else humanize_english_token(stripped) or PAGE_SEGMENT_MAP.get(stripped.lower(), "")
+        )
+    base = normalize_short_title(base) or "页面"
+    return ensure_page_suffix(base)
+
+
+def normalize_page_description(raw: object, file_path: str, struct_name: str | None) -> str:
+    desc = str(raw if raw is not None else "").strip()
+    if desc and has_cjk(desc) and not re.search(r"[A-Za-z]{3,}", desc):
+        return desc
+    return infer_page_title(file_path, struct_name) or desc or "页面"
+
+
+def normalize_feature_title(title: str) -> str:
+    return re.sub(r"\s+", "", title).strip()
+
+
+def humanize_source_feature_title(source: dict, page: BuiltPage) -> str:
+    fn = js_str(source.get("函数名称", "")).strip() if source.get("函数名称") is not None else ""
+    file_path = str(source.get("App源码文件路径") or "").strip()
+    page_label = normalize_page_description(page.entry.get("description"), page.entry["filePath"], page.entry.get("structName"))
+    if is_entry_ability_file(file_path):
+        return ENTRY_ABILITY_TITLES.get(fn) or (f"应用生命周期：{fn}" if fn else "应用生命周期")
+    if is_component_file(file_path):
+        return COMPONENT_TITLES.get(fn) or (f"组件逻辑：{fn}" if fn else "组件逻辑")
+    if fn in PAGE_TITLE_SUFFIXES:
+        return f"{page_label}{PAGE_TITLE_SUFFIXES[fn]}"
+    return f"{page_label}逻辑：{fn}" if fn else f"{page_label}逻辑"
+
+
+def build_ui_feature_id(page_id: str, title: str) -> str:
+    normalized = normalize_feature_title(title) or "功能"
+    return f"ui_{page_id}_{sha1(f'{page_id}:{normalized}')[:10]}"
+
+
+def build_source_feature_id(page_id: str, source: dict) -> str:
+    fn = js_str(source.get("函数名称", "source"))
+    ln = js_number(source.get("行号", 0), 0)
+    base = sanitize_id(f"{fn}_{js_str(ln)}") or "source"
+    suffix = sha1(f"{js_str(source.get('App源码文件路径'))}:{js_str(ln)}:{fn}")[:8]
+    return sanitize_id(f"src_{page_id}_{base}_{suffix}") or f"src_{suffix}"
+
+
+def build_unknown_feature_id(page_id: str, flow: dict) -> str:
+    suffix = sha1(f"{page_id}:{js_str(flow.get('flowId'))}:{js_str(flow.get('pathId'))}")[:10]
+    return sanitize_id(f"unknown_{page_id}_{suffix}") or f"unknown_{suffix}"
+
+
+# ---------------------------------------------------------------------------------------------
+# Source text and function blocks (utils/scanSourceText.ts, callgraph/functionBlocks.ts)
+
+
+@dataclass(frozen=True)
+class FunctionBlock:
+    name: str
+    start_line: int
+    end_line: int
+
+
+def is_js_space(ch: str) -> bool:
+    return ch.isspace() or ch == "﻿"
+
+
+def find_next_non_whitespace(text: str, start: int) -> int | None:
+    for i in range(max(0, start), len(text)):
+        if not is_js_space(text[i]):
+            return i
+    return None
+
+
+def is_escaped(text: str, pos: int) -> bool:
+    count = 0
+    i = pos - 1
+    while i >= 0 and text[i] == "\\":
+        count += 1
+        i -= 1
+    return count % 2 == 1
+
+
+def find_matching_delimiter(text: str, open_pos: int, open_char: str, close_char: str) -> int | None:
+    if open_pos < 0 or open_pos >= len(text) or text[open_pos] != open_char:
+        return None
+    depth = 0
+    mode = ""  # "", "line", "block", "'", '"', "`"
+    i = open_pos
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        nxt = text[i + 1] if i + 1 < n else ""
+        if mode == "line":
+            if ch == "\n":
+                mode = ""
+        elif mode == "block":
+            if ch == "*" and nxt == "/":
+                mode = ""
+                i += 1
+        elif mode:
+            if ch == mode and not is_escaped(text, i):
+                mode = ""
+        elif ch == "/" and nxt == "/":
+            mode = "line"
+            i += 1
+        elif ch == "/" and nxt == "*":
+            mode = "block"
+            i += 1
+        elif ch in "'\"`":
+            mode = ch
+        else:
+            if ch == open_char:
+                depth += 1
+            elif ch == close_char:
+                depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return None
+
+
+def find_function_body_open_brace(text: str, after_close_paren: int, kind: str) -> int | None:
+    pos = find_next_non_whitespace(text, after_close_paren + 1)
+    if pos is None:
+        return None
+    if kind == "arrowAssign":
+        offset = text[pos : pos + 400].find("=>")
+        if offset < 0:
+            return None
+        after = find_next_non_whitespace(text, pos + offset + 2)
+        return after if after is not None and text[after] == "{" else None
+    if text[pos] == "{":
+        return pos
+    if text[pos] != ":":
+        return None
+    for i in range(pos + 1, len(text)):
+        ch = text[i]
+        if ch == "{":
+            type_close = find_matching_delimiter(text, i, "{", "}")
+            if type_close is not None:
+                next_brace = find_next_non_whitespace(text, type_close + 1)
+                if next_brace is not None and text[next_brace] == "{":
+                    return next_brace
+            return i
+        if ch in ";=":
+            return None
+    return None
+
+
+def indent_of(line: str) -> int:
+    return len(line) - len(line.lstrip())
+
+
+def find_block_end_by_indent(lines: list[str], start_line: int, body_line: int) -> int:
+    # Closing line of a block whose braces cannot be matched because the text has gaps: the first
+    # known line after the body that is not indented deeper than the signature.
+    base = indent_of(lines[start_line - 1])
+    last_known = body_line
+    for ln in range(body_line + 1, len(lines) + 1):
+        text = lines[ln - 1]
+        if not text.strip():
+            continue
+        if indent_of(text) <= base:
+            return ln if text.lstrip().startswith("}") else last_known
+        last_known = ln
+    return last_known
+
+
+def scan_function_blocks(text: str, *, sparse: bool = False) -> list[FunctionBlock]:
+    # sparse: text stitched from snippets, fall back to indentation when braces do not match.
+    newlines = [i for i, ch in enumerate(text) if ch == "\n"]
+    line_starts = [0] + [i + 1 for i in newlines]
+
+    def line_at(pos: int) -> int:
+        return bisect_right(line_starts, pos)
+
+    candidates: list[tuple[int, str, int, str]] = []
+    for regex, kind in FUNCTION_RES:
+        for m in regex.finditer(text):
+            name = m.group(1) or ""
+            if not name or name in METHOD_NAME_BLACKLIST:
+                continue
+            signature_pos = m.start() + max(0, m.group(0).find(name))
+            open_paren = text.find("(", signature_pos + len(name))
+            if open_paren <= signature_pos:
+                continue
+            start_line = line_at(signature_pos)
+            line_end = line_starts[start_line] if start_line < len(line_starts) else len(text)
+            if text[line_starts[start_line - 1] : line_end].lstrip().startswith("//"):
+                continue
+            candidates.append((signature_pos, name, open_paren, kind))
+
+    blocks: list[FunctionBlock] = []
+    seen: set[tuple[str, int, int]] = set()
+    for signature_pos, name, open_paren, kind in sorted(candidates, key=lambda c: (c[0], collation_key(c[1]))):
+        close_paren = find_matching_delimiter(text, open_paren, "(", ")")
+        if close_paren is None:
+            continue
+        body_start = find_function_body_open_brace(text, close_paren, kind)
+        if body_start is None or text[body_start] != "{":
+            continue
+        start_line = line_at(signature_pos)
+        body_end = find_matching_delimiter(text, body_start, "{", "}")
+        if body_end is not None:
+            end_line = line_at(body_end)
+        elif sparse:
+            end_line = find_block_end_by_indent(text.split("\n"), start_line, line_at(body_start))
+        else:
+            continue
+        key = (name, start_line, body_start)
+        if key in seen:
+            continue
+        seen.add(key)
+        blocks.append(FunctionBlock(name, start_line, end_line))
+    return blocks
+
+
+class SourceFiles:
+    # App source text per repo-relative path: read from disk under the repo root when available,
+    # otherwise stitched together from the context snippets saved in the run (unknown lines empty).
+
+    def __init__(self, repo_root: Path, snippets: dict[str, dict[int, str]]) -> None:
+        self.repo_root = repo_root
+        self.snippets = snippets
+        self.from_disk: set[str] = set()
+        self.from_snippets: set[str] = set()
+        self._text: dict[str, str | None] = {}
+        self._lines: dict[str, list[str] | None] = {}
+        self._blocks: dict[str, list[FunctionBlock]] = {}
+
+    def text(self, file_path: str) -> str | None:
+        if file_path in self._text:
+            return self._text[file_path]
+        text = None
+        abs_path = (self.repo_root / file_path).resolve() if not os.path.isabs(file_path) else Path(file_path)
+        try:
+            abs_path.relative_to(self.repo_root)
+            inside = abs_path != self.repo_root
+        except ValueError:
+            inside = False
+        if inside:
+            try:
+                text = abs_path.read_text(encoding="utf-8")
+                self.from_disk.add(file_path)
+            except (OSError, UnicodeDecodeError):
+                text = None
+            if text is None and self.snippets.get(file_path):
+                known = self.snippets[file_path]
+                text = "\n".join(known.get(i, "") for i in range(1, max(known) + 1))
+                self.from_snippets.add(file_path)
+        self._text[file_path] = text or None
+        return self._text[file_path]
+
+    def lines(self, file_path: str) -> list[str] | None:
+        if file_path not in self._lines:
+            text = self.text(file_path)
+            self._lines[file_path] = re.split(r"\r?\n", text) if text else None
+        return self._lines[file_path]
+
+    def blocks(self, file_path: str) -> list[FunctionBlock]:
+        if file_path not in self._blocks:
+            text = self.text(file_path)
+            sparse = file_path in self.from_snippets
+            self._blocks[file_path] = scan_function_blocks(text, sparse=sparse) if text else []
+        return self._blocks[file_path]
+
+
+def collect_snippets(ui_tree: dict, dataflows: dict) -> dict[str, dict[int, str]]:
+    out: dict[str, dict[int, str]] = {}
+
+    def add(node: object) -> None:
+        if not isinstance(node, dict):
+            return
+        file_path = node.get("filePath")
+        if not isinstance(file_path, str) or not file_path:
+            return
+        known = out.setdefault(file_path, {})
+        ctx = node.get("context")
+        if isinstance(ctx, dict) and is_number(ctx.get("startLine")) and isinstance(ctx.get("lines"), list):
+            for offset, text in enumerate(ctx["lines"]):
+                known.setdefault(int(ctx["startLine"]) + offset, str(text))
+
+    nodes = ui_tree.get("nodes")
+    for node in nodes.values() if isinstance(nodes, dict) else []:
+        add(node)
+    for flow in as_dicts(dataflows.get("flows")):
+        for node in as_dicts(flow.get("nodes")):
+            add(node)
+    return out
+
+
+def clean_ui_tree(value: object) -> dict:
+    # Drops malformed containers up front (hand-edited or truncated artifacts) so the grouping code
+    # can rely on dict nodes, string roots and dict edges.
+    tree = value if isinstance(value, dict) else {}
+    nodes, roots, meta = tree.get("nodes"), tree.get("roots"), tree.get("meta")
+    return {
+        **tree,
+        "nodes": {k: n for k, n in nodes.items() if isinstance(n, dict)} if isinstance(nodes, dict) else {},
+        "roots": [r for r in roots if isinstance(r, str)] if isinstance(roots, list) else [],
+        "edges": as_dicts(tree.get("edges")),
+        "meta": meta if isinstance(meta, dict) else {},
+    }
+
+
+def clean_dataflows(value: object) -> dict:
+    dataflows = value if isinstance(value, dict) else {}
+    meta = dataflows.get("meta")
+    return {**dataflows, "flows": as_dicts(dataflows.get("flows")), "meta": meta if isinstance(meta, dict) else {}}
+
+
+# ---------------------------------------------------------------------------------------------
+# Grouping (group.ts: groupDataflowsByPageFeature)
+
+
+@dataclass(frozen=True)
+class GroupingOptions:
+    max_ui_distance_strict: int = MAX_UI_DISTANCE_STRICT
+    max_ui_distance_fallback: int = MAX_UI_DISTANCE_FALLBACK
+
+
+@dataclass
+class BuiltPage:
+    page_id: str
+    root_id: str
+    is_root: bool
+    entry: dict
+    ui_nodes: list[dict] = field(default_factory=list)
+    ui_node_by_line: dict[int, list[dict]] = field(default_factory=dict)
+    ui_lines_sorted: list[int] = field(default_factory=list)
+    page_range_start: float = 0
+    page_range_end: float = 0
+    build_range_start: int = 0
+    build_range_end: int = 0
+
+
+@dataclass
+class BuiltFeature:
+    feature: dict
+    flows: list[dict]
+
+
+def page_entry_line(page: BuiltPage) -> int | float:
+    return js_number(page.entry.get("line", 0), 0)
+
+
+def index_ui_nodes(nodes: list[dict]) -> tuple[dict[int, list[dict]], list[int]]:
+    by_line: dict[int, list[dict]] = {}
+    for n in nodes:
+        ln = n.get("line") if is_number(n.get("line")) else None
+        if not ln or ln <= 0:
+            continue
+        by_line.setdefault(ln, []).append(n)
+    return by_line, sorted(by_line)
+
+
+def nearest_line_at_or_before(sorted_lines: list[int], x: float) -> int | None:
+    idx = bisect_right(sorted_lines, x) - 1
+    return sorted_lines[idx] if idx >= 0 else None
+
+
+def pick_best_ui_from_evidence(page: BuiltPage, evidence_lines: Iterable[object], max_distance: float) -> dict | None:
+    lines = sorted({ln for ln in evidence_lines if is_number(ln) and math.isfinite(ln) and ln > 0})
+    if not lines or not page.ui_lines_sorted:
+        return None
+    best: tuple[float, float, int, dict] | None = None
+    for evidence_line in lines:
+        ui_line = nearest_line_at_or_before(page.ui_lines_sorted, evidence_line)
+        if ui_line is None:
+            continue
+        distance = evidence_line - ui_line
+        if distance < 0 or distance > max_distance:
+            continue
+        for node in page.ui_node_by_line.get(ui_line, []):
+            penalty = UI_CATEGORY_PENALTY.get(node.get("category"), OTHER_CATEGORY_PENALTY)
+            score = distance + penalty
+            if best is None or (score, distance, penalty) < best[:3]:
+                best = (score, distance, penalty, node)
+    return best[3] if best else None
+
+
+def pick_containing_block(blocks: list[FunctionBlock], line: float) -> FunctionBlock | None:
+    containing = [b for b in blocks if b.start_line <= line <= b.end_line]
+    if not containing:
+        return None
+    return sorted(containing, key=lambda b: (b.end_line - b.start_line, b.start_line))[0]
+
+
+def flow_nodes(flow: dict) -> list[dict]:
+    nodes = flow.get("nodes")
+    return [n for n in nodes if isinstance(n, dict)] if isinstance(nodes, list) else []
+
+
+def node_line(node: dict) -> float | None:
+    ln = node.get("line")
+    return ln if is_number(ln) else None
+
+
+class Grouper:
+    def __init__(self, run_id: str, ui_tree: dict, sources: list[dict], files: SourceFiles, options: GroupingOptions):
+        self.run_id = run_id
+        self.ui_tree = ui_tree
+        self.files = files
+        self.options = options
+        self.used_page_ids: set[str] = set()
+        self.pages: list[BuiltPage] = []
+        self.special_pages: dict[str, BuiltPage] = {}
+
+        roots = set(ui_tree.get("roots") or [])
+        ui_nodes = [n for n in (ui_tree.get("nodes") or {}).values() if isinstance(n, dict)]
+        for node in ui_nodes:
+            if node.get("category") != "Page":
+                continue
+            file_path = node.get("filePath") or ""
+            struct_name = node.get("name")
+            self.pages.append(BuiltPage(
+                page_id=build_page_id(struct_name, file_path, self.used_page_ids),
+                root_id=node.get("id"),
+                is_root=node.get("id") in roots,
+                entry=drop_none({
+                    "filePath": file_path,
+                    "structName": struct_name,
+                    "line": node.get("line"),
+                    "description": normalize_page_description(node.get("description"), file_path, struct_name),
+                }),
+                page_range_start=js_number(node.get("line", 1), 1),
+                page_range_end=math.inf,
+            ))
+        # Force-attach mode: without pages in the UI tree, one synthetic page still receives the flows.
+        if not self.pages:
+            self.pages.append(BuiltPage(
+                page_id=build_page_id("inferred", "inferred", self.used_page_ids),
+                root_id="",
+                is_root=True,
+                entry={"filePath": "", "structName": "inferred", "line": 0, "description": "推断页面"},
+            ))
+
+        self.pages_by_file: dict[str, list[BuiltPage]] = {}
+        for page in self.pages:
+            if page.entry["filePath"]:
+                self.pages_by_file.setdefault(page.entry["filePath"], []).append(page)
+
+        ui_nodes_by_file: dict[str, list[dict]] = {}
+        for node in ui_nodes:
+            if node.get("category") == "Page" or not node.get("filePath") or not is_number(node.get("line")):
+                continue
+            ui_nodes_by_file.setdefault(node["filePath"], []).append(node)
+        for nodes in ui_nodes_by_file.values():
+            nodes.sort(key=lambda n: (n.get("line") or 0, collation_key(js_str(n.get("id")))))
+
+        # Assign UI nodes to pages (handles multiple @Entry structs in one file).
+        for file_path, pages in self.pages_by_file.items():
+            pages_sorted = sorted(pages, key=lambda p: (page_entry_line(p), collation_key(p.page_id)))
+            nodes = ui_nodes_by_file.get(file_path, [])
+            lines = files.lines(file_path)
+            file_end = len(lines) if lines else math.inf
+            blocks = files.blocks(file_path)
+            for i, cur in enumerate(pages_sorted):
+                start = js_number(cur.entry.get("line", 1), 1)
+                end = page_entry_line(pages_sorted[i + 1]) - 1 if i + 1 < len(pages_sorted) else file_end
+                cur.page_range_start = start
+                cur.page_range_end = end
+                cur.ui_nodes = [n for n in nodes if start <= js_number(n.get("line", 0), 0) <= end]
+                cur.ui_node_by_line, cur.ui_lines_sorted = index_ui_nodes(cur.ui_nodes)
+                builds = sorted((b for b in blocks if b.name == "build" and start <= b.start_line <= end), key=lambda b: b.start_line)
+                if builds:
+                    cur.build_range_start = max(1, builds[0].start_line)
+                    cur.build_range_end = max(cur.build_range_start, builds[0].end_line)
+                else:
+                    cur.build_range_start = cur.build_range_end = 0
+
+        self.sources_by_file_line: dict[str, list[dict]] = {}
+        for s in sources:
+            key = f"{js_str(s.get('App源码文件路径'))}:{js_str(s.get('行号'))}"
+            self.sources_by_file_line.setdefault(key, []).append(s)
+
+    def ensure_special_page(self, kind: str) -> BuiltPage:
+        if kind in self.special_pages:
+            return self.special_pages[kind]
+        entry = (
+            {"filePath": "", "structName": "AppLifecycle", "line": 0, "description": "应用生命周期"}
+            if kind == "app"
+            else {"filePath": "", "structName": "ComponentLogic", "line": 0, "description": "通用组件"}
+        )
+        page = BuiltPage(page_id=build_page_id(entry["structName"], kind, self.used_page_ids), root_id="", is_root=False, entry=entry)
+        self.pages.append(page)
+        self.special_pages[kind] = page
+        return page
+
+    def pick_source_for_flow(self, flow: dict) -> dict | None:
+        for n in flow_nodes(flow):
+            hits = self.sources_by_file_line.get(f"{js_str(n.get('filePath'))}:{js_str(n.get('line'))}")
+            if hits:
+                return next((s for s in hits if s.get("函数名称") == "build"), hits[0])
+        return None
+
+    def pick_ui_hit_for_flow(self, flow: dict, page: BuiltPage) -> dict | None:
+        file_path = page.entry["filePath"]
+        if not file_path or not page.ui_lines_sorted:
+            return None
+        build_start, build_end = page.build_range_start, page.build_range_end
+        has_build = build_start > 0 and build_end >= build_start
+        lines = self.files.lines(file_path) if has_build else None
+        blocks = self.files.blocks(file_path) if has_build else []
+        strict, fallback = self.options.max_ui_distance_strict, self.options.max_ui_distance_fallback
+        nodes = [n for n in flow_nodes(flow) if n.get("filePath") == file_path]
+
+        # S1: evidence lines inside build() from the flow's own nodes.
+        if has_build:
+            evidence = [node_line(n) for n in nodes if node_line(n) is not None and build_start <= node_line(n) <= build_end]
+            picked = pick_best_ui_from_evidence(page, evidence, strict)
+            if picked:
+                return picked
+
+        # S2: handler functions the flow passes through, referenced from inside build().
+        if has_build and lines and blocks:
+            handler_names: dict[str, None] = {}
+            for n in nodes:
+                ln = node_line(n)
+                if ln is None or not page.page_range_start <= ln <= page.page_range_end or build_start <= ln <= build_end:
+                    continue
+                blk = pick_containing_block(blocks, ln)
+                name = blk.name.strip() if blk else ""
+                if name and name not in ("build", "constructor"):
+                    handler_names[name] = None
+            if handler_names:
+                evidence = []
+                for name in handler_names:
+                    re_this = re.compile(rf"\bthis\s*\.\s*{re.escape(name)}\b", re.ASCII)
+                    re_call = re.compile(rf"\b{re.escape(name)}\s*\(", re.ASCII)
+                    for ln in range(build_start, min(build_end, len(lines)) + 1):
+                        text = lines[ln - 1]
+                        if text and (re_this.search(text) or re_call.search(text)):
+                            evidence.append(ln)
+                picked = pick_best_ui_from_evidence(page, evidence, strict)
+                if picked:
+                    return picked
+
+        # S3: permission strings from flow.summary located inside build().
+        if has_build and lines:
+            summary = flow.get("summary") if isinstance(flow.get("summary"), dict) else {}
+            permissions = summary.get("permissions") if isinstance(summary.get("permissions"), list) else []
+            needles = [js_str(p) for p in permissions if js_str(p).strip()]
+            if needles:
+                evidence = [
+                    ln
+                    for ln in range(build_start, min(build_end, len(lines)) + 1)
+                    if lines[ln - 1] and any(p in lines[ln - 1] for p in needles)
+                ]
+                picked = pick_best_ui_from_evidence(page, evidence, strict)
+                if picked:
+                    return picked
+
+        # S4: clamp the flow node closest to build() into it and allow a larger distance.
+        if has_build:
+            candidates = [ln for ln in (node_line(n) for n in nodes) if ln is not None and math.isfinite(ln) and ln > 0]
+            if candidates:
+                best_line, best_dist = candidates[0], math.inf
+                for ln in candidates:
+                    dist = build_start - ln if ln < build_start else (ln - build_end if ln > build_end else 0)
+                    if dist < best_dist:
+                        best_dist, best_line = dist, ln
+                evidence_line = min(build_end, max(build_start, best_line))
+                picked = pick_best_ui_from_evidence(page, [evidence_line], fallback)
+                if picked:
+                    return picked
+        return None
+
+    def score_page_candidate(self, page: BuiltPage, evidence_line: float, base: int) -> float:
+        line = max(1, math.floor(evidence_line)) if math.isfinite(evidence_line) else 1
+        entry_line = page_entry_line(page)
+        score = base + (min(300, abs(line - entry_line)) if entry_line > 0 else 200)
+        if page.is_root:
+            score -= 5
+        if page.build_range_start > 0 and page.build_range_end >= page.build_range_start and page.build_range_start <= line <= page.build_range_end:
+            score -= 20
+        elif page.page_range_start <= line <= page.page_range_end:
+            score -= 10
+        return score
+
+    def pick_default_page(self) -> BuiltPage:
+        roots = sorted((p for p in self.pages if p.is_root), key=lambda p: collation_key(p.page_id))
+        return roots[0] if roots else sorted(self.pages, key=lambda p: collation_key(p.page_id))[0]
+
+    def pick_page_for_flow(self, flow: dict, source: dict | None) -> BuiltPage:
+        candidates: list[tuple[float, BuiltPage]] = []
+        src_file = str((source or {}).get("App源码文件路径") or "")
+        src_line = js_number((source or {}).get("行号", 0), 0)
+        if src_file:
+            for p in self.pages_by_file.get(src_file, []):
+                candidates.append((self.score_page_candidate(p, src_line or js_number(p.entry.get("line", 1), 1), 0), p))
+        for n in flow_nodes(flow):
+            fp = n.get("filePath")
+            ln = js_number(n.get("line", 0), 0)
+            if not fp or ln <= 0:
+                continue
+            for p in self.pages_by_file.get(fp, []):
+                candidates.append((self.score_page_candidate(p, ln, 50), p))
+        if not candidates:
+            src_norm = normalize_path_for_match(src_file)
+            if src_norm and is_entry_ability_file(src_norm):
+                return self.ensure_special_page("app")
+            if src_norm and is_component_file(src_norm):
+                return self.ensure_special_page("component")
+            return self.pick_default_page()
+        candidates.sort(key=lambda c: (c[0], collation_key(c[1].page_id)))
+        return candidates[0][1]
+
+    def feature_for_flow(self, flow: dict, page: BuiltPage, source: dict | None) -> dict:
+        ui_hit = self.pick_ui_hit_for_flow(flow, page)
+        if ui_hit:
+            description = str(ui_hit.get("description") or "").strip()
+            raw_title = description or js_str(ui_hit.get("name") if ui_hit.get("name") is not None else ui_hit.get("category")).strip()
+            title = normalize_feature_title(raw_title) or raw_title or "功能"
+            return {
+                "featureId": build_ui_feature_id(page.page_id, title),
+                "title": title,
+                "kind": "ui",
+                "anchor": {
+                    "filePath": ui_hit.get("filePath") if ui_hit.get("filePath") is not None else page.entry["filePath"],
+                    "line": js_number(ui_hit.get("line", 1), 1),
+                    "uiNodeId": ui_hit.get("id"),
+                },
+            }
+        if source:
+            fn = js_str(source.get("函数名称", "")).strip()
+            return {
+                "featureId": build_source_feature_id(page.page_id, source),
+                "title": humanize_source_feature_title(source, page),
+                "kind": "source",
+                "anchor": drop_none({
+                    "filePath": source.get("App源码文件路径") if source.get("App源码文件路径") is not None else page.entry["filePath"],
+                    "line": js_number(source.get("行号", 1), 1),
+                    "functionName": fn or None,
+                }),
+            }
+        nodes = flow_nodes(flow)
+        first = nodes[0] if nodes else {}
+        file_path = first.get("filePath") if first.get("filePath") is not None else page.entry["filePath"]
+        line = js_number(first.get("line", 1), 1)
+        function_name = ""
+        if file_path and line > 0:
+            blk = pick_containing_block(self.files.blocks(file_path), line)
+            function_name = blk.name.strip() if blk else ""
+        return {
+            "featureId": build_unknown_feature_id(page.page_id, flow),
+            "title": f"处理逻辑：{function_name}" if function_name else "处理逻辑",
+            "kind": "source",
+            "anchor": drop_none({"filePath": file_path, "line": line, "functionName": function_name or None}),
+        }
+
+    def slice_ui_tree(self, page: BuiltPage, generated_at: str) -> dict:
+        all_nodes = self.ui_tree.get("nodes") or {}
+        nodes: dict[str, dict] = {}
+        page_node = all_nodes.get(page.root_id)
+        if page_node:
+            nodes[page.root_id] = page_node
+        for n in page.ui_nodes:
+            nodes[n["id"]] = n
+        edges = [e for e in self.ui_tree.get("edges") or [] if e.get("from") in nodes and e.get("to") in nodes]
+        meta = self.ui_tree.get("meta") or {}
+        return {
+            "meta": drop_none({
+                "runId": meta.get("runId"),
+                "generatedAt": generated_at,
+                "llm": meta.get("llm"),
+                "counts": {
+                    "nodes": len(nodes),
+                    "edges": len(edges),
+                    "pages": sum(1 for n in nodes.values() if n.get("category") == "Page"),
+                    "elements": sum(1 for n in nodes.values() if n.get("category") != "Page"),
+                },
+            }),
+            "roots": [page.root_id] if page_node else [],
+            "nodes": nodes,
+            "edges": edges,
+        }
+
+    def group(self, dataflows: dict) -> dict:
+        generated_at = iso_now()
+        features_by_page: dict[str, dict[str, BuiltFeature]] = {}
+        for flow in dataflows.get("flows") or []:
+            if not isinstance(flow, dict):
+                continue
+            source = self.pick_source_for_flow(flow)
+            page = self.pick_page_for_flow(flow, source)
+            feature = self.feature_for_flow(flow, page, source)
+            page_features = features_by_page.setdefault(page.page_id, {})
+            existing = page_features.get(feature["featureId"])
+            if existing is None:
+                page_features[feature["featureId"]] = BuiltFeature(feature, [flow])
+                continue
+            existing.flows.append(flow)
+            # UI features merged by title keep the earliest anchor line.
+            if feature["kind"] == "ui" and existing.feature["kind"] == "ui" and feature["anchor"]["line"] < existing.feature["anchor"]["line"]:
+                existing.feature["anchor"] = feature["anchor"]
+
+        pages_out = []
+        total_features = 0
+        total_flows = 0
+        for page in sorted(self.pages, key=lambda p: collation_key(p.page_id)):
+            built = sorted(
+                features_by_page.get(page.page_id, {}).values(),
+                key=lambda f: collation_key(
+                    f"{f.feature['kind']}:{js_str(f.feature['anchor']['line'])}:{f.feature['title']}", "zh-Hans-CN"
+                ),
+            )
+            features = []
+            for bf in built:
+                counts = {
+                    "flows": len(bf.flows),
+                    "nodes": sum(len(flow_nodes(f)) for f in bf.flows),
+                    "edges": sum(len(f.get("edges") or []) for f in bf.flows),
+                }
+                fallback = sum(1 for f in bf.flows if (f.get("meta") or {}).get("fallback"))
+                warnings = list(dict.fromkeys(w for f in bf.flows for w in ((f.get("meta") or {}).get("warnings") or [])))
+                info = {**bf.feature, "counts": counts}
+                features.append((info, {
+                    "meta": drop_none({
+                        "runId": self.run_id,
+                        "generatedAt": generated_at,
+                        "llm": (dataflows.get("meta") or {}).get("llm"),
+                        "warnings": warnings or None,
+                        "counts": {**counts, "failedPaths": fallback, "fallbackFlows": fallback},
+                        "page": {"pageId": page.page_id, "entry": page.entry},
+                        "feature": {"featureId": info["featureId"], "kind": info["kind"], "title": info["title"]},
+                    }),
+                    "flows": bf.flows,
+                }))
+                total_flows += counts["flows"]
+            total_features += len(features)
+            page_flows = sum(info["counts"]["flows"] for info, _ in features)
+            page_info = {"pageId": page.page_id, "entry": page.entry, "counts": {"features": len(features), "flows": page_flows}}
+            pages_out.append({
+                "page": page_info,
+                "uiTree": self.slice_ui_tree(page, generated_at) if page.root_id else None,
+                "featuresIndex": {
+                    "meta": {
+                        "runId": self.run_id,
+                        "generatedAt": generated_at,
+                        "pageId": page.page_id,
+                        "counts": {"features": len(features), "flows": page_flows},
+                    },
+                    "page": {"pageId": page.page_id, "entry": page.entry},
+                    "features": [info for info, _ in features],
+                },
+                "features": features,
+            })
+
+        flows_in = sum(1 for f in dataflows.get("flows") or [] if isinstance(f, dict))
+        return {
+            "pagesIndex": {
+                "meta": {
+                    "runId": self.run_id,
+                    "generatedAt": generated_at,
+                    "counts": {
+                        "pages": len(pages_out),
+                        "features": total_features,
+                        "flows": total_flows,
+                        "unassignedFlows": flows_in - total_flows,
+                    },
+                },
+                "pages": [p["page"] for p in pages_out],
+            },
+            "pages": pages_out,
+        }
+
+
+# ---------------------------------------------------------------------------------------------
+# Run level: write the new tree and diff it against the original
+
+
+def write_json(file_path: Path, data: object) -> None:
+    # Same format as writeJsonFile in server/src/utils/accessWorkspace.ts.
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def write_pages(out_dir: Path, grouped: dict) -> None:
+    pages_root = out_dir / "pages"
+    if pages_root.exists():
+        shutil.rmtree(pages_root)
+    write_json(pages_root / "index.json", grouped["pagesIndex"])
+    for p in grouped["pages"]:
+        page_dir = pages_root / p["page"]["pageId"]
+        page_dir.mkdir(parents=True, exist_ok=True)
+        if p["uiTree"]:
+            write_json(page_dir / "ui_tree.json", p["uiTree"])
+        write_json(page_dir / "features" / "index.json", p["featuresIndex"])
+        for info, dataflows in p["features"]:
+            write_json(page_dir / "features" / info["featureId"] / "dataflows.json", dataflows)
+
+
+def updated_meta(meta: dict, grouped: dict) -> dict:
+    counts = grouped["pagesIndex"]["meta"]["counts"]
+    out = dict(meta)
+    out["counts"] = {
+        **(meta.get("counts") or {}),
+        "pageCount": counts["pages"],
+        "pageFeatureCount": counts["features"],
+        "pageFeatureUnassignedFlows": counts["unassignedFlows"],
+    }
+    return out
+
+
+Assignment = dict[str, tuple[str, str]]  # flowId -> (pageId, featureId)
+
+
+def original_assignment(run_dir: Path) -> tuple[Assignment, dict[tuple[str, str], str]]:
+    flows: Assignment = {}
+    titles: dict[tuple[str, str], str] = {}
+    for page_id, feature_id, feature_dir in iter_feature_dirs(run_dir):
+        parsed = read_json_or_none(feature_dir / "dataflows.json")
+        meta_feature = ((parsed or {}).get("meta") or {}).get("feature") if isinstance(parsed, dict) else None
+        titles[(page_id, feature_id)] = str((meta_feature or {}).get("title") or "")
+        for flow in (parsed or {}).get("flows") or [] if isinstance(parsed, dict) else []:
+            if isinstance(flow, dict) and flow.get("flowId"):
+                flows.setdefault(str(flow["flowId"]), (page_id, feature_id))
+    return flows, titles
+
+
+def grouped_assignment(grouped: dict) -> tuple[Assignment, dict[tuple[str, str], str]]:
+    flows: Assignment = {}
+    titles: dict[tuple[str, str], str] = {}
+    for p in grouped["pages"]:
+        page_id = p["page"]["pageId"]
+        for info, dataflows in p["features"]:
+            titles[(page_id, info["featureId"])] = info["title"]
+            for flow in dataflows["flows"]:
+                if flow.get("flowId"):
+                    flows.setdefault(str(flow["flowId"]), (page_id, info["featureId"]))
+    return flows, titles
+
+
+def diff_assignments(old: tuple[Assignment, dict], new: tuple[Assignment, dict]) -> dict:
+    old_flows, old_titles = old
+    new_flows, new_titles = new
+
+    def ref(pair: tuple[str, str] | None) -> dict | None:
+        return None if pair is None else {"pageId": pair[0], "featureId": pair[1]}
+
+    moved = [
+        {"flowId": fid, "from": ref(old_flows.get(fid)), "to": ref(new_flows.get(fid))}
+        for fid in sorted(set(old_flows) | set(new_flows), key=flow_sort_key)
+        if old_flows.get(fid) != new_flows.get(fid)
+    ]
+
+    def feature_list(keys: Iterable[tuple[str, str]], titles: dict) -> list[dict]:
+        return [{"pageId": p, "featureId": f, "title": titles.get((p, f), "")} for p, f in sorted(keys)]
+
+    old_pages = {p for p, _ in old_titles} | {p for p, _ in old_flows.values()}
+    new_pages = {p for p, _ in new_titles}
+    return {
+        "counts": {
+            "flows": len(set(old_flows) | set(new_flows)),
+            "movedFlows": len(moved),
+            "featuresBefore": len(old_titles),
+            "featuresAfter": len(new_titles),
+            "pagesBefore": len(old_pages),
+            "pagesAfter": len(new_pages),
+        },
+        "addedFeatures": feature_list(set(new_titles) - set(old_titles), new_titles),
+        "removedFeatures": feature_list(set(old_titles) - set(new_titles), old_titles),
+        "retitledFeatures": [
+            {"pageId": p, "featureId": f, "before": old_titles[(p, f)], "after": new_titles[(p, f)]}
+            for p, f in sorted(set(old_titles) & set(new_titles))
+            if old_titles[(p, f)] != new_titles[(p, f)]
+        ],
+        "movedFlows": moved,
+    }
+
+
+def flow_sort_key(flow_id: str) -> tuple:
+    m = re.search(r"(\d+)$", flow_id)
+    return (flow_id[: m.start()] if m else flow_id, int(m.group(1)) if m else -1)
+
+
+@dataclass(frozen=True)
+class RegroupResult:
+    app: str
+    run: str
+    run_dir: Path
+    out_dir: Path
+    diff: dict
+    source_files_disk: int
+    source_files_snippets: int
+    elapsed_ms: float
+    error: str = ""  # set when the run could not be regrouped; diff is empty then
+
+    def differs(self) -> bool:
+        d = self.diff
+        return bool(d["movedFlows"] or d["addedFeatures"] or d["removedFeatures"] or d["retitledFeatures"])
+
+
+def regroup_run(
+    app: str,
+    run_dir: Path,
+    out_dir: Path,
+    *,
+    repo_root: Path,
+    options: GroupingOptions = GroupingOptions(),
+) -> RegroupResult:
+    if out_dir.resolve() == run_dir.resolve():
+        raise ValueError(f"Refusing to overwrite the original run: {run_dir}")
+    start = time.perf_counter()
+    meta = read_json_or_none(run_dir / "meta.json")
+    meta = meta if isinstance(meta, dict) else {}
+    ui_tree = clean_ui_tree(read_json_or_none(run_dir / "ui_tree.json"))
+    dataflows = clean_dataflows(read_json_or_none(run_dir / "dataflows.json"))
+    sources = as_dicts(read_json_or_none(run_dir / "sources.json"))
+    run_id = str(meta.get("runId") or f"{app}_{run_dir.name}")
+
+    files = SourceFiles(repo_root, collect_snippets(ui_tree, dataflows))
+    grouped = Grouper(run_id, ui_tree, sources, files, options).group(dataflows)
+    diff = diff_assignments(original_assignment(run_dir), grouped_assignment(grouped))
+
+    write_pages(out_dir, grouped)
+    write_json(out_dir / "meta.json", updated_meta(meta, grouped))
+    write_json(out_dir / DIFF_FILE, {
+        "runId": run_id,
+        "originalDir": str(run_dir),
+        "options": {
+            "maxUiDistanceStrict": options.max_ui_distance_strict,
+            "maxUiDistanceFallback": options.max_ui_distance_fallback,
+        },
+        "sourceFiles": {"disk": sorted(files.from_disk), "snippets": sorted(files.from_snippets)},
+        **diff,
+    })
+    return RegroupResult(
+        app=app,
+        run=run_dir.name,
+        run_dir=run_dir,
+        out_dir=out_dir,
+        diff=diff,
+        source_files_disk=len(files.from_disk),
+        source_files_snippets=len(files.from_snippets),
+        elapsed_ms=(time.perf_counter() - start) * 1000,
+    )
+
+
+def regroup_runs(
+    *,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    out: str | Path = DEFAULT_OUT,
+    apps: Iterable[str] | None = None,
+    latest_only: bool = False,
+    run_dir: str | None = None,
+    run_id: str | None = None,
+    options: GroupingOptions = GroupingOptions(),
+) -> list[RegroupResult]:
+    # Writes <out>/<app>/<run>/ for every selected run (all runs in output/ by default).
+    root = resolve_repo_root(repo_root)
+    out_root = resolve_under(root, output_root)
+    target_root = resolve_under(root, out)
+
+    if run_dir or run_id:
+        d = resolve_run_dir(root, run_dir, run_id)
+        selected = [(d.parent.name, d)]
+    elif latest_only:
+        selected = []
+        for app in sorted({a for a, _ in iter_run_dirs(out_root)}):
+            d = find_latest_run_dir(out_root, app)
+            if d is not None:
+                selected.append((app, d))
+    else:
+        selected = list(iter_run_dirs(out_root))
+    only = set(apps) if apps else None
+
+    results = []
+    for app, d in selected:
+        if only is not None and app not in only:
+            continue
+        if not (d / "ui_tree.json").is_file() or not (d / "dataflows.json").is_file():
+            continue
+        out_dir = target_root / app / d.name
+        start = time.perf_counter()
+        try:
+            results.append(regroup_run(app, d, out_dir, repo_root=root, options=options))
+        except Exception as e:
+            # Report the run as failed and keep going; a malformed artifact must not abort the batch.
+            results.append(RegroupResult(
+                app=app,
+                run=d.name,
+                run_dir=d,
+                out_dir=out_dir,
+                diff={},
+                source_files_disk=0,
+                source_files_snippets=0,
+                elapsed_ms=(time.perf_counter() - start) * 1000,
+                error=f"{type(e).__name__}: {e}",
+            ))
+    return results
+
+
+def git_blob_id(file_path: Path) -> str:
+    data = file_path.read_bytes()
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def stale_mirrored_sources(repo_root: str | Path | None = None) -> list[str]:
+    # Mirrored TS files whose content no longer matches MIRRORED_SOURCES (missing files are skipped,
+    # e.g. when only output/ was copied somewhere).
+    root = resolve_repo_root(repo_root)
+    return [
+        rel
+        for rel, blob in MIRRORED_SOURCES.items()
+        if (root / rel).is_file() and git_blob_id(root / rel) != blob
+    ]
+
+
+def result_json(r: RegroupResult) -> dict:
+    head = {"app": r.app, "run": r.run, "runDir": str(r.run_dir), "outDir": str(r.out_dir)}
+    if r.error:
+        return {**head, "error": r.error}
+    return {
+        **head,
+        "sourceFiles": {"disk": r.source_files_disk, "snippets": r.source_files_snippets},
+        "elapsedMs": round(r.elapsed_ms, 1),
+        **r.diff["counts"],
+    }
+
+
+def render_results(results: list[RegroupResult], details: bool = False) -> str:
+    headers = ["App", "Run", "Flows", "Moved", "Pages", "Features", "+Feat", "-Feat", "Sources(disk/snip)", "Time(ms)"]
+    ok = [r for r in results if not r.error]
+    failed = [r for r in results if r.error]
+    rows = []
+    for r in results:
+        if r.error:
+            rows.append([r.app, r.run, "failed", "", "", "", "", "", "", f"{r.elapsed_ms:.0f}"])
+            continue
+        c = r.diff["counts"]
+        rows.append([
+            r.app,
+            r.run,
+            str(c["flows"]),
+            str(c["movedFlows"]),
+            f"{c['pagesBefore']}->{c['pagesAfter']}",
+            f"{c['featuresBefore']}->{c['featuresAfter']}",
+            str(len(r.diff["addedFeatures"])),
+            str(len(r.diff["removedFeatures"])),
+            f"{r.source_files_disk}/{r.source_files_snippets}",
+            f"{r.elapsed_ms:.0f}",
+        ])
+    rows.append([
+        "TOTAL",
+        f"{len(ok)} runs" + (f", {len(failed)} failed" if failed else ""),
+        str(sum(r.diff["counts"]["flows"] for r in ok)),
+        str(sum(r.diff["counts"]["movedFlows"] for r in ok)),
+        "",
+        "",
+        str(sum(len(r.diff["addedFeatures"]) for r in ok)),
+        str(sum(len(r.diff["removedFeatures"]) for r in ok)),
+        "",
+        f"{sum(r.elapsed_ms for r in results):.0f}",
+    ])
+    lines = [render_rows(headers, rows)]
+    if failed:
+        lines.append("")
+        lines += [f"[{r.app} {r.run}] failed: {r.error}" for r in failed]
+    if details:
+        for r in ok:
+            moved = r.diff["movedFlows"]
+            if not moved:
+                continue
+            lines.append("")
+            lines.append(f"[{r.app} {r.run}] moved flows:")
+            for m in moved:
+                src = "-" if m["from"] is None else f"{m['from']['pageId']}/{m['from']['featureId']}"
+                dst = "-" if m["to"] is None else f"{m['to']['pageId']}/{m['to']['featureId']}"
+                lines.append(f"  {m['flowId']}: {src} -> {dst}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Regenerate the pages/ tree of existing runs from ui_tree.json + dataflows.json (no LLM calls).",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--output-root", default="output", help="Output root dir (default: output)")
+    parser.add_argument("--out", default=DEFAULT_OUT, help=f"Where to write <app>/<run>/ (default: {DEFAULT_OUT})")
+    parser.add_argument("--app", action="append", default=[], help="Only this app (repeatable)")
+    parser.add_argument("--latest", action="store_true", help="Only the latest run per app")
+    parser.add_argument("--run-dir", default="", help="Regroup a single run dir")
+    parser.add_argument("--run-id", default="", help="Regroup a single run (resolved via output/_runs)")
+    parser.add_argument(
+        "--max-ui-distance",
+        type=int,
+        default=MAX_UI_DISTANCE_STRICT,
+        help=f"Max lines between flow evidence and a UI node (default: {MAX_UI_DISTANCE_STRICT})",
+    )
+    parser.add_argument(
+        "--fallback-ui-distance",
+        type=int,
+        default=MAX_UI_DISTANCE_FALLBACK,
+        help=f"Max distance for the clamped fallback strategy (default: {MAX_UI_DISTANCE_FALLBACK})",
+    )
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    parser.add_argument("--details", action="store_true", help="List moved flows per run")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit 1 if any run regroups differently from its original pages/ tree, fails, or group.ts/ui.ts changed since the port",
+    )
+    args = parser.parse_args(argv)
+
+    strict = max(1, args.max_ui_distance)
+    options = GroupingOptions(strict, max(strict, args.fallback_ui_distance))
+    if args.check and options != GroupingOptions():
+        parser.error("--check compares against the analyzer's grouping and needs the default distances")
+    try:
+        results = regroup_runs(
+            repo_root=args.repo_root or None,
+            output_root=args.output_root,
+            out=args.out,
+            apps=args.app or None,
+            latest_only=args.latest,
+            run_dir=args.run_dir or None,
+            run_id=args.run_id or None,
+            options=options,
+        )
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.format == "json":
+        print(json.dumps(
+            [{**result_json(r), **({"diff": r.diff} if args.details and not r.error else {})} for r in results],
+            indent=2,
+            ensure_ascii=False,
+        ))
+    else:
+        print(render_results(results, details=args.details))
+    if any(r.error for r in results):
+        return 1
+    if args.check:
+        stale = stale_mirrored_sources(args.repo_root or None)
+        differing = [r for r in results if r.differs()]
+        for rel in stale:
+            print(f"check: {rel} changed since the revision mirrored here (see MIRRORED_SOURCES)", file=sys.stderr)
+        for r in differing:
+            print(f"check: {r.app} {r.run} regroups differently (see {r.out_dir / DIFF_FILE})", file=sys.stderr)
+        if stale or differing:
+            return 1
+    return 0
@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+
+# Persistent inverted index over privacy facts, dataflow nodes and sinks of every run, so questions
+# like "which apps/features collect 手机号, and via which flow node?" need no grepping.
+#
+# Indexed fields (one hit per occurrence, pointing back to app/run/page/feature/flow/node):
+#   dataItem         facts.dataPractices[*].dataItems[*].name   (one hit per ref)
+#   dataSource       facts.dataPractices[*].dataSources[*]
+#   permission       facts.permissionPractices[*].permissionName (one hit per ref)
+#   nodeCode         dataflows.json flows[*].nodes[*].code
+#   nodeDescription  dataflows.json flows[*].nodes[*].description
+#   sinkApiKey       sinks.json __apiKey (linked to the dataflow nodes at the same file/line)
+#
+# Storage is a single SQLite file (stdlib only): distinct texts are tokenized once and shared
+# across runs, terms -> text ids form the postings, and hits map text ids back to their locations.
+# Tokenization is CJK-aware: CJK runs are indexed as unigrams + bigrams, ASCII identifiers as the
+# whole word plus its camelCase/underscore parts. Query chunks must additionally occur verbatim
+# (case-insensitive) in the matched text, so "手机号" does not match "机号…手机".
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import unicodedata
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from oh_eval.common import (
+    as_dicts,
+    as_int,
+    display_width,
+    file_signature,
+    iter_feature_dirs,
+    iter_run_dirs,
+    normalize_path,
+    read_json_or_none,
+    render_rows,
+    resolve_repo_root,
+    resolve_under,
+    split_columns,
+)
+
+DEFAULT_INDEX = "output/_search_index/index.sqlite"
+INDEX_VERSION = 1
+FIELDS = ("dataItem", "dataSource", "permission", "nodeCode", "nodeDescription", "sinkApiKey")
+HIT_COLUMNS = ("app", "run", "runId", "field", "pageId", "featureId", "flowId", "nodeId", "filePath", "line", "text")
+APP_FEATURE_ID = "__app_permissions"
+
+TOKEN_RE = re.compile(r"([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+)|([A-Za-z0-9]+)")
+WORD_PART_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|[0-9]+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS info(key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS runs(
+    run_key TEXT PRIMARY KEY, app TEXT NOT NULL, run TEXT NOT NULL, run_id TEXT, signature TEXT
+);
+CREATE TABLE IF NOT EXISTS texts(id INTEGER PRIMARY KEY, text TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS terms(term TEXT NOT NULL, text_id INTEGER NOT NULL, PRIMARY KEY (term, text_id)) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hits(
+    run_key TEXT NOT NULL, field TEXT NOT NULL, text_id INTEGER NOT NULL,
+    page_id TEXT, feature_id TEXT, flow_id TEXT, node_id TEXT, file_path TEXT, line INTEGER
+);
+CREATE INDEX IF NOT EXISTS hits_text ON hits(text_id);
+CREATE INDEX IF NOT EXISTS hits_run ON hits(run_key);
+"""
+
+
+def normalize_text(text: str) -> str:
+    # NFKC folds full-width letters/digits (ＩＤ -> ID) so both scripts tokenize the same way.
+    return unicodedata.normalize("NFKC", text)
+
+
+def tokenize(text: str, *, query: bool = False) -> list[str]:
+    # Index side emits every token a query could ask for; query side emits the minimal set needed
+    # to find candidates (bigrams for CJK runs, word parts for identifiers).
+    out: list[str] = []
+    for m in TOKEN_RE.finditer(normalize_text(text)):
+        cjk, word = m.group(1), m.group(2)
+        if cjk:
+            if len(cjk) == 1 or not query:
+                out.extend(cjk)
+            out.extend(cjk[i : i + 2] for i in range(len(cjk) - 1))
+            continue
+        parts = [p.lower() for p in WORD_PART_RE.findall(word)]
+        if query:
+            out.extend(parts if len(parts) > 1 else [word.lower()])
+        else:
+            out.append(word.lower())
+            if len(parts) > 1:
+                out.extend(parts)
+    return list(dict.fromkeys(out))
+
+
+def clean_text(value: object) -> str:
+    return str(value).strip() if isinstance(value, (str, int, float)) else ""
+
+
+@dataclass
+class RunLayout:
+    # Node locations from the run-level dataflows.json and flow -> [(pageId, featureId)] from the
+    # per-feature dataflows.json files; flows not assigned to any feature map to [(None, None)].
+    nodes: dict[str, tuple[str, str | None, int | None, str, str]] = field(default_factory=dict)
+    flow_features: dict[str, list[tuple[str | None, str | None]]] = field(default_factory=dict)
+
+    def features_of(self, flow_id: str | None) -> list[tuple[str | None, str | None]]:
+        return self.flow_features.get(flow_id or "") or [(None, None)]
+
+
+def load_run_layout(run_dir: Path) -> RunLayout:
+    layout = RunLayout()
+    parsed = read_json_or_none(run_dir / "dataflows.json")
+    for flow in as_dicts(parsed.get("flows") if isinstance(parsed, dict) else None):
+        flow_id = clean_text(flow.get("flowId"))
+        if not flow_id:
+            continue
+        for node in as_dicts(flow.get("nodes")):
+            node_id = clean_text(node.get("id"))
+            if not node_id:
+                continue
+            layout.nodes[node_id] = (
+                flow_id,
+                normalize_path(node.get("filePath")) or None,
+                as_int(node.get("line")),
+                clean_text(node.get("code")),
+                clean_text(node.get("description")),
+            )
+
+    for page_id, feature_id, feature_dir in iter_feature_dirs(run_dir):
+        parsed = read_json_or_none(feature_dir / "dataflows.json")
+        for flow in as_dicts(parsed.get("flows") if isinstance(parsed, dict) else None):
+            flow_id = clean_text(flow.get("flowId"))
+            if flow_id:
+                layout.flow_features.setdefault(flow_id, []).append((page_id, feature_id))
+    return layout
+
+
+def node_location(layout: RunLayout, node_id: str | None) -> tuple[str | None, int | None]:
+    node = layout.nodes.get(node_id or "")
+    return (node[1], node[2]) if node else (None, None)
+
+
+# Hits are (field, text, pageId, featureId, flowId, nodeId, filePath, line) tuples.
+def ref_hits(
+    field_name: str, text: str, page_id: str | None, feature_id: str | None, refs: object, layout: RunLayout
+) -> Iterable[tuple]:
+    refs = [r for r in as_dicts(refs) if clean_text(r.get("flowId")) or clean_text(r.get("nodeId"))]
+    if not refs:
+        yield (field_name, text, page_id, feature_id, None, None, None, None)
+        return
+    for ref in refs:
+        flow_id = clean_text(ref.get("flowId")) or None
+        node_id = clean_text(ref.get("nodeId")) or None
+        yield (field_name, text, page_id, feature_id, flow_id, node_id, *node_location(layout, node_id))
+
+
+def iter_fact_hits(facts_file: Path, page_id: str | None, feature_id: str, layout: RunLayout) -> Iterable[tuple]:
+    parsed = read_json_or_none(facts_file)
+    facts = parsed.get("facts") if isinstance(parsed, dict) else None
+    if not isinstance(facts, dict):
+        return
+    for practice in as_dicts(facts.get("dataPractices")):
+        sources = practice.get("dataSources")
+        for source in sources if isinstance(sources, list) else []:
+            text = clean_text(source)
+            if text:
+                yield ("dataSource", text, page_id, feature_id, None, None, None, None)
+        for item in as_dicts(practice.get("dataItems")):
+            text = clean_text(item.get("name"))
+            if text:
+                yield from ref_hits("dataItem", text, page_id, feature_id, item.get("refs"), layout)
+    for practice in as_dicts(facts.get("permissionPractices")):
+        text = clean_text(practice.get("permissionName"))
+        if text:
+            yield from ref_hits("permission", text, page_id, feature_id, practice.get("refs"), layout)
+
+
+def iter_run_hits(run_dir: Path) -> Iterable[tuple]:
+    layout = load_run_layout(run_dir)
+
+    app_facts = run_dir / "app_permissions" / "privacy_facts.json"
+    if app_facts.is_file():
+        yield from iter_fact_hits(app_facts, None, APP_FEATURE_ID, layout)
+    for page_id, feature_id, feature_dir in iter_feature_dirs(run_dir):
+        facts_file = feature_dir / "privacy_facts.json"
+        if facts_file.is_file():
+            yield from iter_fact_hits(facts_file, page_id, feature_id, layout)
+
+    by_location: dict[tuple[str, int], list[str]] = {}
+    for node_id, (flow_id, file_path, line, code, description) in layout.nodes.items():
+        for page_id, feature_id in layout.features_of(flow_id):
+            if code:
+                yield ("nodeCode", code, page_id, feature_id, flow_id, node_id, file_path, line)
+            if description:
+                yield ("nodeDescription", description, page_id, feature_id, flow_id, node_id, file_path, line)
+        if file_path and line is not None:
+            by_location.setdefault((file_path, line), []).append(node_id)
+
+    sinks = read_json_or_none(run_dir / "sinks.json")
+    for record in as_dicts(sinks):
+        api_key = clean_text(record.get("__apiKey"))
+        if not api_key:
+            continue
+        file_path = normalize_path(record.get("App源码文件路径")) or None
+        line = as_int(record.get("调用行号"))
+        node_ids = by_location.get((file_path, line), []) if file_path and line is not None else []
+        if not node_ids:
+            yield ("sinkApiKey", api_key, None, None, None, None, file_path, line)
+        for node_id in node_ids:
+            flow_id = layout.nodes[node_id][0]
+            for page_id, feature_id in layout.features_of(flow_id):
+                yield ("sinkApiKey", api_key, page_id, feature_id, flow_id, node_id, file_path, line)
+
+
+def connect(index_file: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(index_file)
+    conn.executescript(SCHEMA)
+    row = conn.execute("SELECT value FROM info WHERE key = 'version'").fetchone()
+    if row is not None and row[0] != str(INDEX_VERSION):
+        # Tokenizer/schema changed: postings are not comparable, start over.
+        conn.close()
+        os.remove(index_file)
+        return connect(index_file)
+    conn.execute("INSERT OR REPLACE INTO info(key, value) VALUES ('version', ?)", (str(INDEX_VERSION),))
+    return conn
+
+
+def open_index(index_file: Path) -> sqlite3.Connection:
+    if not index_file.is_file():
+        raise FileNotFoundError(f"Search index not found: {index_file} (run the build command first)")
+    return sqlite3.connect(f"file:{index_file}?mode=ro", uri=True)
+
+
+class TextTable:
+    # Interns texts into the texts table, tokenizing each distinct text only once.
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        self.ids: dict[str, int] = dict(conn.execute("SELECT text, id FROM texts"))
+
+    def intern(self, text: str) -> int:
+        text_id = self.ids.get(text)
+        if text_id is not None:
+            return text_id
+        text_id = self.conn.execute("INSERT INTO texts(text) VALUES (?)", (text,)).lastrowid
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO terms(term, text_id) VALUES (?, ?)", ((t, text_id) for t in tokenize(text))
+        )
+        self.ids[text] = text_id
+        return text_id
+
+
+def delete_runs(conn: sqlite3.Connection, run_keys: Iterable[str]) -> None:
+    for key in run_keys:
+        conn.execute("DELETE FROM hits WHERE run_key = ?", (key,))
+        conn.execute("DELETE FROM runs WHERE run_key = ?", (key,))
+
+
+def drop_orphan_texts(conn: sqlite3.Connection) -> int:
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS orphans(id INTEGER PRIMARY KEY)")
+    conn.execute("DELETE FROM orphans")
+    conn.execute("INSERT INTO orphans SELECT id FROM texts WHERE id NOT IN (SELECT DISTINCT text_id FROM hits)")
+    conn.execute("DELETE FROM terms WHERE text_id IN (SELECT id FROM orphans)")
+    return conn.execute("DELETE FROM texts WHERE id IN (SELECT id FROM orphans)").rowcount
+
+
+@dataclass
+class IndexStats:
+    indexed_runs: list[str] = field(default_factory=list)
+    skipped_runs: int = 0
+    removed_runs: list[str] = field(default_factory=list)
+    hits: dict[str, int] = field(default_factory=dict)
+    texts: int = 0
+    terms: int = 0
+
+
+def build_search_index(
+    index_file: str | Path = DEFAULT_INDEX,
+    *,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    apps: Iterable[str] | None = None,
+    rebuild: bool = False,
+) -> IndexStats:
+    # Incremental by default: a run is (re)indexed only when its meta.json signature changed, and runs
+    # that disappeared from output/ are dropped. Each run is committed on its own. rebuild=True starts
+    # from an empty index (or, with apps, first drops only those apps' runs).
+    root = resolve_repo_root(repo_root)
+    index_path = resolve_under(root, index_file)
+    out_root = resolve_under(root, output_root)
+    only = set(apps) if apps else None
+
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    if rebuild and only is None and index_path.exists():
+        os.remove(index_path)
+    conn = connect(index_path)
+    stats = IndexStats()
+    try:
+        known = {key: (app, sig) for key, app, sig in conn.execute("SELECT run_key, app, signature FROM runs")}
+        if rebuild and only is not None:
+            with conn:
+                delete_runs(conn, [k for k, (app, _) in known.items() if app in only])
+                drop_orphan_texts(conn)
+            known = {k: v for k, v in known.items() if v[0] not in only}
+        texts = TextTable(conn)
+        seen: set[str] = set()
+        for app, run_dir in iter_run_dirs(out_root):
+            if only is not None and app not in only:
+                continue
+            key = f"{app}/{run_dir.name}"
+            seen.add(key)
+            sig = json.dumps(file_signature(run_dir / "meta.json"))
+            if key in known and known[key][1] == sig:
+                stats.skipped_runs += 1
+                continue
+            meta = read_json_or_none(run_dir / "meta.json")
+            run_id = clean_text(meta.get("runId")) if isinstance(meta, dict) else ""
+            with conn:
+                delete_runs(conn, [key])
+                rows = []
+                for hit in dict.fromkeys(iter_run_hits(run_dir)):
+                    field_name, text, *location = hit
+                    rows.append((key, field_name, texts.intern(text), *location))
+                    stats.hits[field_name] = stats.hits.get(field_name, 0) + 1
+                conn.executemany(
+                    "INSERT INTO hits(run_key, field, text_id, page_id, feature_id, flow_id, node_id, file_path, line)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT INTO runs(run_key, app, run, run_id, signature) VALUES (?, ?, ?, ?, ?)",
+                    (key, app, run_dir.name, run_id or f"{app}_{run_dir.name}", sig),
+                )
+            stats.indexed_runs.append(key)
+
+        stats.removed_runs = sorted(k for k, (app, _) in known.items() if k not in seen and (only is None or app in only))
+        if stats.removed_runs or any(k in known for k in stats.indexed_runs):
+            with conn:
+                delete_runs(conn, stats.removed_runs)
+                drop_orphan_texts(conn)
+        stats.texts = conn.execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+        stats.terms = conn.execute("SELECT COUNT(DISTINCT term) FROM terms").fetchone()[0]
+    finally:
+        conn.close()
+    return stats
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    app: str
+    run: str
+    run_id: str
+    field: str
+    page_id: str | None
+    feature_id: str | None
+    flow_id: str | None
+    node_id: str | None
+    file_path: str | None
+    line: int | None
+    text: str
+
+
+def candidate_text_ids(conn: sqlite3.Connection, query: str) -> list[int]:
+    # AND over all query tokens as a self-join of the postings, driven by the shortest posting list
+    # (CROSS JOIN keeps that order), then a verbatim (case-insensitive) check of every whitespace
+    # separated query chunk against the text. Ids never become bound parameters, so a common CJK
+    # character matching tens of thousands of texts stays within SQLite's variable limit.
+    chunks = [normalize_text(c).lower() for c in query.split() if tokenize(c, query=True)]
+    tokens = list(dict.fromkeys(t for c in chunks for t in tokenize(c, query=True)))
+    if not tokens:
+        return []
+    sizes = {t: conn.execute("SELECT COUNT(*) FROM terms WHERE term = ?", (t,)).fetchone()[0] for t in tokens}
+    if not all(sizes.values()):
+        return []
+    tokens.sort(key=sizes.__getitem__)
+    joins = "".join(
+        f" CROSS JOIN terms p{i} ON p{i}.term = ? AND p{i}.text_id = p0.text_id" for i in range(1, len(tokens))
+    )
+    rows = conn.execute(
+        f"SELECT t.id, t.text FROM terms p0{joins} CROSS JOIN texts t ON t.id = p0.text_id WHERE p0.term = ?",
+        [*tokens[1:], tokens[0]],
+    )
+    return [text_id for text_id, text in rows if all(c in normalize_text(text).lower() for c in chunks)]
+
+
+def query_search_index(
+    query: str,
+    index_file: str | Path = DEFAULT_INDEX,
+    *,
+    fields: Iterable[str] | None = None,
+    apps: Iterable[str] | None = None,
+    latest_only: bool = False,
+    repo_root: str | Path | None = None,
+) -> list[SearchHit]:
+    root = resolve_repo_root(repo_root)
+    conn = open_index(resolve_under(root, index_file))
+    try:
+        text_ids = candidate_text_ids(conn, query)
+        if not text_ids:
+            return []
+        conn.execute("CREATE TEMP TABLE candidates(id INTEGER PRIMARY KEY)")
+        conn.executemany("INSERT INTO candidates(id) VALUES (?)", ((i,) for i in text_ids))
+        where: list[str] = []
+        params: list[object] = []
+        fields = list(fields or [])
+        if fields:
+            where.append(f"h.field IN ({','.join('?' * len(fields))})")
+            params.extend(fields)
+        apps = list(apps or [])
+        if apps:
+            where.append(f"r.app IN ({','.join('?' * len(apps))})")
+            params.extend(apps)
+        if latest_only:
+            # Run dirs are YYYYMMDD-HHMMSS, so the lexicographic max is the latest run.
+            where.append("r.run = (SELECT MAX(r2.run) FROM runs r2 WHERE r2.app = r.app)")
+        # CROSS JOIN: drive from the (usually small) candidate set through the hits_text index.
+        rows = conn.execute(
+            "SELECT r.app, r.run, r.run_id, h.field, h.page_id, h.feature_id, h.flow_id, h.node_id,"
+            " h.file_path, h.line, t.text"
+            " FROM candidates c CROSS JOIN hits h ON h.text_id = c.id"
+            " JOIN runs r ON r.run_key = h.run_key JOIN texts t ON t.id = h.text_id"
+            f"{' WHERE ' + ' AND '.join(where) if where else ''}"
+            " ORDER BY r.app, r.run, h.field, h.page_id, h.feature_id, h.flow_id, h.node_id",
+            params,
+        ).fetchall()
+    finally:
+        conn.close()
+    return [SearchHit(*row) for row in rows]
+
+
+def hit_json(hit: SearchHit) -> dict:
+    return dict(zip(HIT_COLUMNS, (
+        hit.app, hit.run, hit.run_id, hit.field, hit.page_id, hit.feature_id,
+        hit.flow_id, hit.node_id, hit.file_path, hit.line, hit.text,
+    )))
+
+
+def group_hits(hits: list[SearchHit], columns: list[str]) -> list[dict]:
+    counts: dict[tuple, int] = {}
+    for hit in hits:
+        row = hit_json(hit)
+        key = tuple(row[c] for c in columns)
+        counts[key] = counts.get(key, 0) + 1
+    grouped = [{**dict(zip(columns, key)), "count": n} for key, n in counts.items()]
+    grouped.sort(key=lambda r: (-r["count"], [str(r[c]) for c in columns]))
+    return grouped
+
+
+def shorten(text: object, width: int = 48) -> str:
+    s = " ".join(str("" if text is None else text).split())
+    if display_width(s) <= width:
+        return s
+    while display_width(s) > width - 1:
+        s = s[:-1]
+    return s + "…"
+
+
+def format_rows(rows: list[dict], columns: list[str]) -> str:
+    return render_rows(columns, [[shorten(r.get(c)) for c in columns] for r in rows])
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(
+        description="Build / query an inverted index over privacy facts, dataflow nodes and sinks of all runs.",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--index", default=DEFAULT_INDEX, help=f"Index file (default: {DEFAULT_INDEX})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Index new/changed runs (incremental)")
+    p_build.add_argument("--output-root", default="output", help="Output root dir (default: output)")
+    p_build.add_argument("--app", action="append", default=[], help="Only index this app (repeatable)")
+    p_build.add_argument("--rebuild", action="store_true", help="Drop the index and re-index every run (with --app: only those apps' runs)")
+
+    p_query = sub.add_parser("query", help="Find hits containing all query words (e.g. 手机号, location)")
+    p_query.add_argument("query", nargs="+", help="Query words; every word must occur in the matched text")
+    p_query.add_argument("--field", action="append", default=[], choices=FIELDS, help="Only this field (repeatable)")
+    p_query.add_argument("--app", action="append", default=[], help="Only this app (repeatable)")
+    p_query.add_argument("--latest", action="store_true", help="Only the latest run per app")
+    p_query.add_argument("--group-by", default="", help=f"Comma separated columns to count by ({', '.join(HIT_COLUMNS)})")
+    p_query.add_argument("--top", type=int, default=20, help="Max rows to print (default: 20)")
+    p_query.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root or None
+    if args.command == "build":
+        stats = build_search_index(
+            args.index, repo_root=repo_root, output_root=args.output_root, apps=args.app or None, rebuild=args.rebuild
+        )
+        print(f"Indexed runs: {len(stats.indexed_runs)} (unchanged: {stats.skipped_runs}, removed: {len(stats.removed_runs)})")
+        for name in FIELDS:
+            if name in stats.hits:
+                print(f"  {name}: {stats.hits[name]} hits")
+        print(f"Distinct texts: {stats.texts}, terms: {stats.terms}")
+        return 0
+
+    group_by = split_columns(args.group_by)
+    unknown = [c for c in group_by if c not in HIT_COLUMNS]
+    if unknown:
+        parser.error(f"Unknown --group-by column(s): {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    try:
+        hits = query_search_index(
+            " ".join(args.query),
+            args.index,
+            fields=args.field or None,
+            apps=args.app or None,
+            latest_only=args.latest,
+            repo_root=repo_root,
+        )
+    except FileNotFoundError as e:
+        print(str(e), file=sys.stderr)
+        return 2
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if group_by:
+        rows, columns = group_hits(hits, group_by), [*group_by, "count"]
+    else:
+        rows = [hit_json(h) for h in hits]
+        columns = ["app", "run", "field", "featureId", "flowId", "nodeId", "text"]
+    if args.format == "json":
+        print(json.dumps({"query": " ".join(args.query), "hits": len(hits), "rows": rows[: args.top]}, indent=2, ensure_ascii=False))
+        return 0
+    print(f"Hits: {len(hits)} ({elapsed_ms:.1f} ms)")
+    if rows:
+        print(format_rows(rows[: args.top], columns))
+        if len(rows) > args.top:
+            print(f"... {len(rows) - args.top} more (use --top)")
+    return 0
@@ -0,0 +1,427 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import sys
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+from oh_eval.common import (
+    ArtifactCache,
+    EvalReport,
+    EvalResult,
+    as_int,
+    counts_json,
+    default_cache,
+    find_latest_run_dir,
+    iter_groundtruth_apps,
+    make_result,
+    normalize_path,
+    render_table,
+    resolve_repo_root,
+    resolve_run_dir,
+    resolve_under,
+    sum_results,
+)
+from oh_eval.streaming import SpillFile, external_sort, iter_json_array
+
+
+@dataclass(frozen=True, order=True)
+class SinkKey:
+    file: str
+    line: int
+    api_key: str
+
+
+def to_sink_key(record: dict) -> SinkKey | None:
+    file_path = normalize_path(record.get("App源码文件路径"))
+    call_line = as_int(record.get("调用行号")) or 0
+    api_key = str(record.get("__apiKey") or "").strip()
+    if not file_path or call_line <= 0 or not api_key:
+        return None
+    return SinkKey(file=file_path, line=call_line, api_key=api_key)
+
+
+def load_sink_records(file_path: Path) -> list[dict]:
+    if not file_path.exists():
+        return []
+    parsed = json.loads(file_path.read_text(encoding="utf-8"))
+    if not isinstance(parsed, list):
+        raise ValueError(f"Expected JSON array in {file_path}")
+    out: list[dict] = []
+    for item in parsed:
+        if isinstance(item, dict):
+            out.append(item)
+    return out
+
+
+def collect_keys(records: list[dict]) -> tuple[set[SinkKey], dict[SinkKey, dict], int]:
+    keys: set[SinkKey] = set()
+    mapping: dict[SinkKey, dict] = {}
+    invalid = 0
+    for r in records:
+        k = to_sink_key(r)
+        if not k:
+            invalid += 1
+            continue
+        keys.add(k)
+        mapping.setdefault(k, r)
+    return keys, mapping, invalid
+
+
+@dataclass(frozen=True)
+class SinkKeySet:
+    # What evaluation keeps of a sinks.json (and what the artifact cache holds): the comparable keys,
+    # the 调用代码 of the first record per key (for --details) and the count of unusable records.
+    keys: frozenset[SinkKey]
+    call_codes: Mapping[SinkKey, object]
+    invalid: int
+
+
+EMPTY_KEY_SET = SinkKeySet(frozenset(), MappingProxyType({}), 0)
+
+
+def load_sink_key_set(file_path: Path) -> SinkKeySet:
+    keys, mapping, invalid = collect_keys(load_sink_records(file_path))
+    call_codes = {k: r.get("调用代码") for k, r in mapping.items() if r.get("调用代码") is not None}
+    return SinkKeySet(frozenset(keys), MappingProxyType(call_codes), invalid)
+
+
+def evaluate_key_sets(
+    gt: frozenset[SinkKey] | set[SinkKey], pred: frozenset[SinkKey] | set[SinkKey], invalid_gt: int = 0, invalid_pred: int = 0
+) -> EvalResult:
+    missing = sorted([k for k in gt if k not in pred])
+    extra = sorted([k for k in pred if k not in gt])
+    return make_result(len(gt), len(pred), missing, extra, invalid_gt, invalid_pred)
+
+
+def evaluate_sets(gt_records: list[dict], pred_records: list[dict]) -> EvalResult:
+    gt, _, invalid_gt = collect_keys(gt_records)
+    pred, _, invalid_pred = collect_keys(pred_records)
+    return evaluate_key_sets(gt, pred, invalid_gt, invalid_pred)
+
+
+def find_latest_pred_sinks(output_root: Path, app: str) -> Path | None:
+    run_dir = find_latest_run_dir(output_root, app, marker="sinks.json")
+    return run_dir / "sinks.json" if run_dir else None
+
+
+def key_to_human(k: SinkKey, call_code: object = None) -> str:
+    base = f"{k.file}:{k.line} {k.api_key}"
+    call_code = str(call_code or "").strip()
+    return f"{base} | {call_code}" if call_code else base
+
+
+@dataclass(frozen=True)
+class AppEval:
+    app: str
+    groundtruth_file: Path
+    pred_sinks_file: Path | None
+    result: EvalResult
+    # 调用代码 of the missing (gt_map) / extra (pred_map) keys, for --details rendering.
+    gt_map: dict[SinkKey, object]
+    pred_map: dict[SinkKey, object]
+
+
+def evaluate_app(app: str, gt_file: Path, pred_file: Path | None, cache: ArtifactCache | None = None) -> AppEval:
+    cache = cache if cache is not None else default_cache
+    gt = cache.get(gt_file, load_sink_key_set)
+    pred = cache.get(pred_file, load_sink_key_set) if pred_file and pred_file.exists() else EMPTY_KEY_SET
+    res = evaluate_key_sets(gt.keys, pred.keys, gt.invalid, pred.invalid)
+
+    # Fresh dicts per result, so callers never hold a reference into the shared cache.
+    gt_map = {k: gt.call_codes[k] for k in res.missing if k in gt.call_codes}
+    pred_map = {k: pred.call_codes[k] for k in res.extra if k in pred.call_codes}
+    return AppEval(app=app, groundtruth_file=gt_file, pred_sinks_file=pred_file, result=res, gt_map=gt_map, pred_map=pred_map)
+
+
+# Streaming path: records are parsed one at a time and projected to a sink ref
+#   (file, line, api_key, byte_offset, byte_length)
+# whose tuple order equals SinkKey order. Refs are externally sorted under a memory budget and
+# compared by a sorted merge-join; full records are only re-read (by offset) for --details.
+SINK_REF_BYTES = 160  # approx. size of one ref tuple + list slot; path/api strings are interned
+
+
+def iter_sink_refs(file_path: Path | None, invalid: list[int]) -> Iterator[tuple]:
+    if not file_path or not file_path.exists():
+        return
+    for offset, length, record in iter_json_array(file_path):
+        if not isinstance(record, dict):
+            continue
+        k = to_sink_key(record)
+        if not k:
+            invalid[0] += 1
+            continue
+        yield (sys.intern(k.file), k.line, sys.intern(k.api_key), offset, length)
+
+
+def sorted_unique_refs(refs: Iterable[tuple], tmp_dir: str, memory_budget_bytes: int) -> Iterator[tuple]:
+    merged, _ = external_sort(refs, tmp_dir, memory_budget_bytes, lambda _: SINK_REF_BYTES)
+    last = None
+    for ref in merged:
+        # Equal keys arrive ordered by offset, so the first one is the first record in the file
+        # (same choice as collect_keys' setdefault).
+        if ref[:3] != last:
+            last = ref[:3]
+            yield ref
+
+
+class SpilledKeys:
+    # Missing/extra refs of the streaming path with --details, kept on disk instead of in memory.
+    # Iterates like the sorted key list of the in-memory path; items() additionally re-reads each
+    # record's 调用代码 by offset from the sinks.json the refs came from.
+
+    def __init__(self, source: Path | None) -> None:
+        self.source = source
+        self.refs = SpillFile(prefix="oh-eval-sink-refs-")
+
+    def append(self, ref: tuple) -> None:
+        self.refs.append(ref)
+
+    def __len__(self) -> int:
+        return len(self.refs)
+
+    def __iter__(self) -> Iterator[SinkKey]:
+        for file, line, api_key, _, _ in self.refs:
+            yield SinkKey(file=file, line=line, api_key=api_key)
+
+    def items(self) -> Iterator[tuple[SinkKey, object]]:
+        if not len(self):
+            return
+        if not self.source:
+            yield from ((k, None) for k in self)
+            return
+        with open(self.source, "rb") as f:
+            for file, line, api_key, offset, length in self.refs:
+                f.seek(offset)
+                record = json.loads(f.read(length).decode("utf-8"))
+                yield SinkKey(file=file, line=line, api_key=api_key), record.get("调用代码")
+
+
+def key_details(keys: Iterable[SinkKey], call_codes: Mapping[SinkKey, object]) -> Iterable[tuple[SinkKey, object]]:
+    # (key, 调用代码) pairs of missing/extra keys for --details rendering.
+    if isinstance(keys, SpilledKeys):
+        return keys.items()
+    return ((k, call_codes.get(k)) for k in keys)
+
+
+def merge_join(
+    gt_refs: Iterator[tuple],
+    pred_refs: Iterator[tuple],
+    missing: SpilledKeys | None = None,
+    extra: SpilledKeys | None = None,
+) -> tuple[int, int, int, int]:
+    # Returns (gt_size, pred_size, fn, fp); the missing/extra refs themselves are only kept when a
+    # spill target is given, so counting needs no memory beyond the two sorted inputs.
+    gt_size = pred_size = fn = fp = 0
+    g = next(gt_refs, None)
+    p = next(pred_refs, None)
+    while g is not None or p is not None:
+        if p is None or (g is not None and g[:3] < p[:3]):
+            if missing is not None:
+                missing.append(g)
+            fn += 1
+            gt_size += 1
+            g = next(gt_refs, None)
+        elif g is None or p[:3] < g[:3]:
+            if extra is not None:
+                extra.append(p)
+            fp += 1
+            pred_size += 1
+            p = next(pred_refs, None)
+        else:
+            gt_size += 1
+            pred_size += 1
+            g = next(gt_refs, None)
+            p = next(pred_refs, None)
+    return gt_size, pred_size, fn, fp
+
+
+def evaluate_app_streaming(
+    app: str,
+    gt_file: Path,
+    pred_file: Path | None,
+    memory_budget_bytes: int,
+    details: bool = False,
+) -> AppEval:
+    import tempfile
+
+    invalid_gt = [0]
+    invalid_pred = [0]
+    missing = SpilledKeys(gt_file) if details else None
+    extra = SpilledKeys(pred_file) if details else None
+    # Each side may keep its last (unspilled) sorted chunk in memory during the join, so split the budget.
+    side_budget = max(memory_budget_bytes // 2, SINK_REF_BYTES)
+    with tempfile.TemporaryDirectory(prefix="oh-eval-sinks-") as tmp_dir:
+        gt_refs = sorted_unique_refs(iter_sink_refs(gt_file, invalid_gt), tmp_dir, side_budget)
+        pred_refs = sorted_unique_refs(iter_sink_refs(pred_file, invalid_pred), tmp_dir, side_budget)
+        gt_size, pred_size, fn, fp = merge_join(gt_refs, pred_refs, missing, extra)
+
+    res = make_result(
+        gt_size,
+        pred_size,
+        missing if missing is not None else [],
+        extra if extra is not None else [],
+        invalid_gt[0],
+        invalid_pred[0],
+        fn=fn,
+        fp=fp,
+    )
+    # Call codes are read back lazily through key_details(), so the maps stay empty.
+    return AppEval(app=app, groundtruth_file=gt_file, pred_sinks_file=pred_file, result=res, gt_map={}, pred_map={})
+
+
+def evaluate_sinks(
+    app: str | None = None,
+    *,
+    run_dir: str | None = None,
+    run_id: str | None = None,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    groundtruth_dir: str | Path = "groundtruth/sink",
+    cache: ArtifactCache | None = None,
+    streaming: bool = False,
+    memory_budget_mb: float = 64,
+    details: bool = False,
+) -> EvalReport:
+    # Evaluate sink recognition (sinks.json) against groundtruth/sink/<app>.json.
+    # With app=None every groundtruth file is evaluated against the latest run under output/<app>/.
+    # streaming=True bounds memory by memory_budget_mb and bypasses the cache; missing/extra keys are
+    # then only kept when details=True, spilled to disk (read them through key_details()).
+    root = resolve_repo_root(repo_root)
+    out_root = resolve_under(root, output_root)
+    gt_dir = resolve_under(root, groundtruth_dir)
+
+    single_app = (app or "").strip() or None
+    run_dir = (run_dir or "").strip() or None
+    run_id = (run_id or "").strip() or None
+    if (run_dir or run_id) and not single_app:
+        raise ValueError("--run-dir/--run-id require --app (single-app mode)")
+
+    apps: list[str]
+    if single_app:
+        apps = [single_app]
+    else:
+        apps = list(iter_groundtruth_apps(gt_dir, ".json"))
+        if not apps:
+            raise ValueError(f"No groundtruth sink files found under: {gt_dir}")
+
+    rows: list[AppEval] = []
+    for a in apps:
+        gt_file = gt_dir / f"{a}.json"
+        if not gt_file.exists():
+            raise FileNotFoundError(f"Missing groundtruth file: {gt_file}")
+
+        pred_file: Path | None
+        if single_app and (run_dir or run_id):
+            pred_file = resolve_run_dir(root, run_dir, run_id) / "sinks.json"
+        else:
+            pred_file = find_latest_pred_sinks(out_root, a)
+
+        if streaming:
+            rows.append(evaluate_app_streaming(a, gt_file, pred_file, int(memory_budget_mb * 1024 * 1024), details))
+        else:
+            rows.append(evaluate_app(a, gt_file, pred_file, cache))
+
+    return EvalReport(repo_root=root, groundtruth_dir=gt_dir, output_root=out_root, results=rows, totals=sum_results([r.result for r in rows]))
+
+
+def key_json(k: SinkKey, call_code: object) -> dict:
+    return {"file": k.file, "line": k.line, "apiKey": k.api_key, "callCode": call_code}
+
+
+def invalid_json(r: EvalResult) -> dict:
+    return {"groundtruth": r.invalid_gt_records, "predicted": r.invalid_pred_records}
+
+
+def report_json(report: EvalReport, details: bool) -> dict:
+    return {
+        "repoRoot": str(report.repo_root),
+        "groundtruthDir": str(report.groundtruth_dir),
+        "outputRoot": str(report.output_root),
+        "results": [
+            {
+                "app": r.app,
+                "groundtruthFile": str(r.groundtruth_file),
+                "predSinksFile": str(r.pred_sinks_file) if r.pred_sinks_file else None,
+                "counts": counts_json(r.result),
+                "recall": r.result.recall,
+                "precision": r.result.precision,
+                "falsePositiveRate": r.result.false_positive_rate,
+                "invalidRecords": invalid_json(r.result),
+                "missing": [key_json(k, c) for k, c in key_details(r.result.missing, r.gt_map)] if details else None,
+                "extra": [key_json(k, c) for k, c in key_details(r.result.extra, r.pred_map)] if details else None,
+            }
+            for r in report.results
+        ],
+        "totals": {
+            "counts": counts_json(report.totals),
+            "recall": report.totals.recall,
+            "precision": report.totals.precision,
+            "falsePositiveRate": report.totals.false_positive_rate,
+            "invalidRecords": invalid_json(report.totals),
+        },
+    }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Batch evaluate sink recognition (sinks.json) against groundtruth/sink/*.json",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--app", default="", help="Evaluate only one app (groundtruth/sink/<app>.json)")
+    parser.add_argument("--output-root", default="output", help="Output root dir (default: output)")
+    parser.add_argument("--groundtruth-dir", default="groundtruth/sink", help="Groundtruth dir (default: groundtruth/sink)")
+    parser.add_argument("--run-dir", default="", help="(Single-app) Use a specific run directory (absolute or relative)")
+    parser.add_argument("--run-id", default="", help="(Single-app) Use output/_runs/<runId>.json to locate run directory")
+    parser.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    parser.add_argument("--details", action="store_true", help="Print missing/extra sink lists")
+    parser.add_argument("--streaming", action="store_true", help="Parse incrementally and merge-join sorted keys (bounded memory)")
+    parser.add_argument("--memory-budget-mb", type=float, default=64, help="(--streaming) Memory budget before spilling to disk (default: 64)")
+    args = parser.parse_args(argv)
+
+    report = evaluate_sinks(
+        args.app,
+        run_dir=args.run_dir,
+        run_id=args.run_id,
+        repo_root=args.repo_root or None,
+        output_root=args.output_root,
+        groundtruth_dir=args.groundtruth_dir,
+        streaming=args.streaming,
+        memory_budget_mb=args.memory_budget_mb,
+        details=args.details,
+    )
+
+    if args.format == "json":
+        print(json.dumps(report_json(report, args.details), indent=2, ensure_ascii=False))
+        return 0
+
+    print(f"Repo: {report.repo_root}")
+    print(f"Groundtruth: {report.groundtruth_dir}")
+    print(f"Output: {report.output_root}")
+    print("")
+    print(render_table(report.results, report.totals))
+
+    if report.totals.invalid_gt_records or report.totals.invalid_pred_records:
+        print("")
+        print(f"Invalid records ignored: groundtruth={report.totals.invalid_gt_records}, predicted={report.totals.invalid_pred_records}")
+
+    if args.details:
+        for r in report.results:
+            print("")
+            print(f"== {r.app} ==")
+            print(f"GT: {r.groundtruth_file}")
+            print(f"Pred: {r.pred_sinks_file or '(missing)'}")
+            print(f"Missing (FN, in GT but not Pred): {len(r.result.missing)}")
+            for k, call_code in key_details(r.result.missing, r.gt_map):
+                print(f"  - {key_to_human(k, call_code)}")
+            print(f"Extra (FP, in Pred but not GT): {len(r.result.extra)}")
+            for k, call_code in key_details(r.result.extra, r.pred_map):
+                print(f"  - {key_to_human(k, call_code)}")
+
+    return 0
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+
+# Memory-bounded building blocks for evaluating very large JSON artifacts:
+#   - iter_json_array: incremental parse of a top-level JSON array, yielding each element with its
+#     byte offset/length in the file so it can be re-read later without keeping it in memory;
+#   - external_sort: sort tuples under a memory budget, spilling sorted runs to temp files and
+#     k-way merging them back;
+#   - SpillFile: append-only temp file of tuples for results too large to keep in memory.
+
+from __future__ import annotations
+
+import codecs
+import heapq
+import json
+import os
+import pickle
+import tempfile
+import weakref
+from collections.abc import Callable, Iterable, Iterator
+from pathlib import Path
+
+CHUNK_SIZE = 1 << 20
+WHITESPACE = " \t\r\n"
+MAX_TOKEN_TAIL = 16  # longest partial token a decode error can point before the buffer end ("-Infinit")
+
+
+def iter_json_array(file_path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[tuple[int, int, object]]:
+    # Yields (byte_offset, byte_length, value) for each element of the top-level array.
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    with open(file_path, "rb") as f:
+        buf = ""
+        idx = 0
+        pos = 0  # byte offset of buf[idx] in the file
+        eof = False
+
+        def fill(size: int) -> bool:
+            nonlocal buf, idx, eof
+            if eof:
+                return False
+            buf = buf[idx:]
+            idx = 0
+            data = f.read(size)
+            if not data:
+                eof = True
+                buf += utf8.decode(b"", final=True)
+                return False
+            buf += utf8.decode(data)
+            return True
+
+        def skip_whitespace() -> None:
+            # Whitespace is ASCII, so characters and bytes advance together.
+            nonlocal idx, pos
+            while True:
+                while idx < len(buf) and buf[idx] in WHITESPACE:
+                    idx += 1
+                    pos += 1
+                if idx < len(buf) or not fill(chunk_size):
+                    return
+
+        skip_whitespace()
+        if idx >= len(buf) or buf[idx] != "[":
+            raise ValueError(f"Expected JSON array in {file_path}")
+        idx += 1
+        pos += 1
+
+        while True:
+            skip_whitespace()
+            if idx >= len(buf):
+                raise ValueError(f"Unterminated JSON array in {file_path}")
+            if buf[idx] == "]":
+                return
+            size = chunk_size
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buf, idx)
+                except json.JSONDecodeError as e:
+                    # A cut-off element only fails at the end of the buffered text (or as a string
+                    # still open there): read more (geometrically) and retry. An error further back
+                    # is a real syntax error; raise it without reading the rest of the file.
+                    truncated = e.pos >= len(buf) - MAX_TOKEN_TAIL or e.msg.startswith("Unterminated string")
+                    if not truncated or not fill(size):
+                        raise
+                    size *= 2
+                    continue
+                # A scalar is only complete once the next structural character is buffered: "12" may
+                # be the start of "123", and "1500." / "1e" decode as 1500 / 1 before the cut.
+                if not eof and not isinstance(value, (dict, list, str)):
+                    nxt = end
+                    while nxt < len(buf) and buf[nxt] in WHITESPACE:
+                        nxt += 1
+                    if nxt >= len(buf) or buf[nxt] not in ",]":
+                        fill(size)
+                        continue
+                break
+            length = len(buf[idx:end].encode("utf-8"))
+            yield pos, length, value
+            idx = end
+            pos += length
+            skip_whitespace()
+            if idx < len(buf) and buf[idx] == ",":
+                idx += 1
+                pos += 1
+            elif idx < len(buf) and buf[idx] != "]":
+                raise ValueError(f"Malformed JSON array in {file_path} near byte {pos}")
+
+
+def _write_run(dir_path: str, items: list[tuple]) -> str:
+    fd, run_path = tempfile.mkstemp(prefix="run-", suffix=".pkl", dir=dir_path)
+    with os.fdopen(fd, "wb") as f:
+        for item in items:
+            # One pickle per item (no shared memo) so reading back stays O(1) memory per run.
+            f.write(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+    return run_path
+
+
+def _read_run(run_path: str) -> Iterator[tuple]:
+    with open(run_path, "rb") as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def external_sort(
+    items: Iterable[tuple],
+    tmp_dir: str,
+    memory_budget_bytes: int,
+    item_size: Callable[[tuple], int],
+) -> tuple[Iterator[tuple], int]:
+    # Consumes `items` eagerly, spilling sorted runs into tmp_dir whenever the estimated in-memory
+    # size exceeds the budget. Returns (merged sorted iterator, number of spilled runs). The iterator
+    # reads from tmp_dir, so it must be consumed before tmp_dir is removed.
+    chunk: list[tuple] = []
+    used = 0
+    runs: list[str] = []
+    for item in items:
+        chunk.append(item)
+        used += item_size(item)
+        if used >= memory_budget_bytes:
+            chunk.sort()
+            runs.append(_write_run(tmp_dir, chunk))
+            chunk = []
+            used = 0
+    chunk.sort()
+    if not runs:
+        return iter(chunk), 0
+    return heapq.merge(*[_read_run(p) for p in runs], chunk), len(runs)
+
+
+class SpillFile:
+    # Append-only temp file of pickled tuples. len() needs no read, iteration re-reads the file with
+    # O(1) memory (and may be repeated). The file is deleted when the object is garbage collected.
+
+    def __init__(self, prefix: str = "spill-") -> None:
+        fd, self.path = tempfile.mkstemp(prefix=prefix, suffix=".pkl")
+        self._out = os.fdopen(fd, "wb")
+        self._count = 0
+        self._finalizer = weakref.finalize(self, _remove_spill, self._out, self.path)
+
+    def append(self, item: tuple) -> None:
+        self._out.write(pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL))
+        self._count += 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[tuple]:
+        self._out.flush()
+        return _read_run(self.path)
+
+
+def _remove_spill(out, path: str) -> None:
+    out.close()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,606 @@
+# -*- coding: utf-8 -*-
+
+# Columnar export of run artifacts (sinks/sources/callgraph/dataflows) into Parquet tables.
+#
+# Layout (hive-style partitions, one Parquet file per app/run/table):
+#   <warehouse>/<table>/app=<app>/run=<run>/part-0.parquet
+#   <warehouse>/groundtruth_sinks/app=<app>/part-0.parquet
+#   <warehouse>/_manifest.json          exported runs -> meta.json signature
+#
+# Every fact table carries the run's meta.json inputs (graphBackend, llmProvider, llmModel) so
+# per-backend / per-model aggregations need no join. pyarrow is an optional dependency and is
+# only imported when exporting or querying.
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from oh_eval.common import (
+    as_int,
+    file_signature,
+    iter_run_dirs,
+    normalize_path,
+    read_json_or_none,
+    render_rows,
+    resolve_repo_root,
+    resolve_under,
+    split_columns,
+)
+
+MANIFEST_FILE = "_manifest.json"
+FORMAT_VERSION = 2  # bump when flatten_* output changes so existing partitions get re-exported
+PART_FILE = "part-0.parquet"
+RUN_INPUT_COLUMNS = ("graphBackend", "llmProvider", "llmModel")
+
+
+def require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise RuntimeError("pyarrow is required for the warehouse export/query (pip install pyarrow)") from e
+    return pyarrow
+
+
+def table_schemas() -> dict[str, object]:
+    pa = require_pyarrow()
+    s, i, b = pa.string(), pa.int64(), pa.bool_()
+    run_inputs = [(c, s) for c in RUN_INPUT_COLUMNS]
+    return {
+        "runs": pa.schema(
+            [
+                ("runId", s),
+                ("appPath", s),
+                ("sdkPath", s),
+                ("csvDir", s),
+                ("maxDataflowPaths", i),
+                *run_inputs,
+                ("uiLlmProvider", s),
+                ("uiLlmModel", s),
+                ("privacyReportLlmProvider", s),
+                ("privacyReportLlmModel", s),
+                ("appFiles", i),
+                ("sinks", i),
+                ("sources", i),
+                ("callGraphNodes", i),
+                ("callGraphEdges", i),
+                ("dataflows", i),
+                ("dataflowNodes", i),
+                ("dataflowEdges", i),
+                ("dataflowFailedPaths", i),
+                ("dataflowFallbackFlows", i),
+                ("dataflowSkipped", b),
+                ("uiTreeNodes", i),
+                ("uiTreeEdges", i),
+                ("pageCount", i),
+                ("pageFeatureCount", i),
+                ("pageFeatureUnassignedFlows", i),
+            ]
+        ),
+        "sinks": pa.schema(
+            [
+                *run_inputs,
+                ("filePath", s),
+                ("line", i),
+                ("apiKey", s),
+                ("module", s),
+                ("importLine", i),
+                ("importCode", s),
+                ("callCode", s),
+                ("description", s),
+                ("permissions", pa.list_(s)),
+            ]
+        ),
+        "sources": pa.schema([*run_inputs, ("filePath", s), ("line", i), ("functionName", s), ("description", s)]),
+        "callgraph_nodes": pa.schema(
+            [*run_inputs, ("nodeId", s), ("type", s), ("filePath", s), ("line", i), ("name", s), ("code", s), ("description", s)]
+        ),
+        "callgraph_edges": pa.schema([*run_inputs, ("from", s), ("to", s), ("kind", s)]),
+        "dataflow_nodes": pa.schema(
+            [
+                *run_inputs,
+                ("flowId", s),
+                ("pathId", s),
+                ("sinkApiKey", s),
+                ("nodeId", s),
+                ("position", i),
+                ("flowLength", i),
+                ("isLast", b),
+                ("filePath", s),
+                ("line", i),
+                ("code", s),
+                ("description", s),
+            ]
+        ),
+        "groundtruth_sinks": pa.schema([("filePath", s), ("line", i), ("apiKey", s), ("callCode", s)]),
+    }
+
+
+RUN_TABLES = ("runs", "sinks", "sources", "callgraph_nodes", "callgraph_edges", "dataflow_nodes")
+
+
+def as_str(value: object) -> str | None:
+    return None if value is None else str(value)
+
+
+def as_list(value: object, key: str) -> list:
+    items = value.get(key) if isinstance(value, dict) else value
+    return [x for x in items if isinstance(x, dict)] if isinstance(items, list) else []
+
+
+def run_inputs(meta: dict) -> dict:
+    inputs = meta.get("input") if isinstance(meta.get("input"), dict) else {}
+    return {
+        # Runs written before --graphBackend existed used the heuristic builder.
+        "graphBackend": str(inputs.get("graphBackend") or "heuristic"),
+        "llmProvider": as_str(inputs.get("llmProvider")),
+        "llmModel": as_str(inputs.get("llmModel")),
+    }
+
+
+def flatten_run(run_dir: Path) -> dict[str, list[dict]]:
+    # Reads one run directory and returns table name -> rows (without app/run partition columns).
+    meta = read_json_or_none(run_dir / "meta.json")
+    meta = meta if isinstance(meta, dict) else {}
+    inputs = meta.get("input") if isinstance(meta.get("input"), dict) else {}
+    counts = meta.get("counts") if isinstance(meta.get("counts"), dict) else {}
+    scan = meta.get("scan") if isinstance(meta.get("scan"), dict) else {}
+    base = run_inputs(meta)
+
+    run_row = {
+        "runId": as_str(meta.get("runId")),
+        "appPath": as_str(inputs.get("appPath")),
+        "sdkPath": as_str(inputs.get("sdkPath")),
+        "csvDir": as_str(inputs.get("csvDir")),
+        "maxDataflowPaths": as_int(inputs.get("maxDataflowPaths")),
+        **base,
+        "uiLlmProvider": as_str(inputs.get("uiLlmProvider")),
+        "uiLlmModel": as_str(inputs.get("uiLlmModel")),
+        "privacyReportLlmProvider": as_str(inputs.get("privacyReportLlmProvider")),
+        "privacyReportLlmModel": as_str(inputs.get("privacyReportLlmModel")),
+        "appFiles": as_int(scan.get("appFiles")),
+        "dataflowSkipped": bool(counts.get("dataflowSkipped")) if "dataflowSkipped" in counts else None,
+    }
+    for k in (
+        "sinks",
+        "sources",
+        "callGraphNodes",
+        "callGraphEdges",
+        "dataflows",
+        "dataflowNodes",
+        "dataflowEdges",
+        "dataflowFailedPaths",
+        "dataflowFallbackFlows",
+        "uiTreeNodes",
+        "uiTreeEdges",
+        "pageCount",
+        "pageFeatureCount",
+        "pageFeatureUnassignedFlows",
+    ):
+        run_row[k] = as_int(counts.get(k))
+
+    sinks = [
+        {
+            **base,
+            "filePath": normalize_path(r.get("App源码文件路径")),
+            "line": as_int(r.get("调用行号")),
+            "apiKey": str(r.get("__apiKey") or "").strip() or None,  # stripped like eval_sinks / groundtruth
+            "module": as_str(r.get("__module")),
+            "importLine": as_int(r.get("导入行号")),
+            "importCode": as_str(r.get("导入代码")),
+            "callCode": as_str(r.get("调用代码")),
+            "description": as_str(r.get("API功能描述")),
+            "permissions": [str(p) for p in r["__permissions"]] if isinstance(r.get("__permissions"), list) else None,
+        }
+        for r in as_list(read_json_or_none(run_dir / "sinks.json"), "")
+    ]
+    sources = [
+        {
+            **base,
+            "filePath": normalize_path(r.get("App源码文件路径")),
+            "line": as_int(r.get("行号")),
+            "functionName": as_str(r.get("函数名称")),
+            "description": as_str(r.get("描述")),
+        }
+        for r in as_list(read_json_or_none(run_dir / "sources.json"), "")
+    ]
+
+    callgraph = read_json_or_none(run_dir / "callgraph.json")
+    cg_nodes = [
+        {
+            **base,
+            "nodeId": as_str(n.get("id")),
+            "type": as_str(n.get("type")),
+            "filePath": normalize_path(n.get("filePath")),
+            "line": as_int(n.get("line")),
+            "name": as_str(n.get("name")),
+            "code": as_str(n.get("code")),
+            "description": as_str(n.get("description")),
+        }
+        for n in as_list(callgraph, "nodes")
+    ]
+    cg_edges = [
+        {**base, "from": as_str(e.get("from")), "to": as_str(e.get("to")), "kind": as_str(e.get("kind"))}
+        for e in as_list(callgraph, "edges")
+    ]
+
+    # Tag every node of a flow with the API of the flow's last node on a sink call site, so node
+    # counts can be grouped per sink without a join. That is usually the last node, but flows may
+    # continue past the sink call (callbacks, return values), so the last node alone is not enough.
+    sink_api_by_site: dict[tuple[str, int | None], str | None] = {}
+    for r in sinks:
+        sink_api_by_site.setdefault((r["filePath"], r["line"]), r["apiKey"])
+
+    df_nodes: list[dict] = []
+    for flow in as_list(read_json_or_none(run_dir / "dataflows.json"), "flows"):
+        nodes = as_list(flow, "nodes")
+        sites = [(normalize_path(n.get("filePath")), as_int(n.get("line"))) for n in nodes]
+        sink_api = next((sink_api_by_site[site] for site in reversed(sites) if site in sink_api_by_site), None)
+        for pos, n in enumerate(nodes):
+            df_nodes.append(
+                {
+                    **base,
+                    "flowId": as_str(flow.get("flowId")),
+                    "pathId": as_str(flow.get("pathId")),
+                    "sinkApiKey": sink_api,
+                    "nodeId": as_str(n.get("id")),
+                    "position": pos,
+                    "flowLength": len(nodes),
+                    "isLast": pos == len(nodes) - 1,
+                    "filePath": normalize_path(n.get("filePath")),
+                    "line": as_int(n.get("line")),
+                    "code": as_str(n.get("code")),
+                    "description": as_str(n.get("description")),
+                }
+            )
+
+    return {
+        "runs": [run_row],
+        "sinks": sinks,
+        "sources": sources,
+        "callgraph_nodes": cg_nodes,
+        "callgraph_edges": cg_edges,
+        "dataflow_nodes": df_nodes,
+    }
+
+
+def flatten_groundtruth_sinks(file_path: Path) -> list[dict]:
+    # Deduplicated by (filePath, line, apiKey), matching the set semantics of eval_sinks.
+    rows: dict[tuple, dict] = {}
+    for r in as_list(read_json_or_none(file_path), ""):
+        row = {
+            "filePath": normalize_path(r.get("App源码文件路径")),
+            "line": as_int(r.get("调用行号")),
+            "apiKey": str(r.get("__apiKey") or "").strip(),
+            "callCode": as_str(r.get("调用代码")),
+        }
+        if row["filePath"] and row["line"] and row["line"] > 0 and row["apiKey"]:
+            rows.setdefault((row["filePath"], row["line"], row["apiKey"]), row)
+    return list(rows.values())
+
+
+def write_partition(dir_path: Path, rows: list[dict], schema: object) -> None:
+    pa = require_pyarrow()
+    import pyarrow.parquet as pq
+
+    dir_path.mkdir(parents=True, exist_ok=True)
+    tmp = dir_path / (PART_FILE + ".tmp")
+    pq.write_table(pa.Table.from_pylist(rows, schema=schema), tmp)
+    os.replace(tmp, dir_path / PART_FILE)
+
+
+def load_manifest(warehouse: Path) -> dict:
+    parsed = read_json_or_none(warehouse / MANIFEST_FILE)
+    if not isinstance(parsed, dict):
+        return {"version": FORMAT_VERSION, "runs": {}, "groundtruth": {}}
+    parsed.setdefault("runs", {})
+    parsed.setdefault("groundtruth", {})
+    if parsed.get("version") != FORMAT_VERSION:
+        # Written by an older flattening: keep the keys (so vanished runs are still dropped) but
+        # forget the signatures so every partition is rewritten.
+        parsed["runs"] = dict.fromkeys(parsed["runs"])
+        parsed["groundtruth"] = dict.fromkeys(parsed["groundtruth"])
+        parsed["version"] = FORMAT_VERSION
+    return parsed
+
+
+def save_manifest(warehouse: Path, manifest: dict) -> None:
+    tmp = warehouse / (MANIFEST_FILE + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, ensure_ascii=False, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, warehouse / MANIFEST_FILE)
+
+
+def drop_partition(dir_path: Path) -> None:
+    # Removes app=<app>/run=<run>/ (or app=<app>/) and the app dir once it is empty.
+    if dir_path.is_dir():
+        shutil.rmtree(dir_path)
+    parent = dir_path.parent
+    if parent.name.startswith("app=") and parent.is_dir() and not any(parent.iterdir()):
+        parent.rmdir()
+
+
+@dataclass
+class ExportStats:
+    exported_runs: list[str] = field(default_factory=list)
+    skipped_runs: int = 0
+    removed_runs: list[str] = field(default_factory=list)
+    exported_groundtruth: list[str] = field(default_factory=list)
+    removed_groundtruth: list[str] = field(default_factory=list)
+    rows: dict[str, int] = field(default_factory=dict)
+
+
+def export_warehouse(
+    warehouse_dir: str | Path = "output/_warehouse",
+    *,
+    repo_root: str | Path | None = None,
+    output_root: str | Path = "output",
+    groundtruth_dir: str | Path = "groundtruth/sink",
+    apps: Iterable[str] | None = None,
+    rebuild: bool = False,
+) -> ExportStats:
+    # Incremental by default: a run is (re)exported only when its meta.json signature is not in the
+    # manifest, so appending new runs touches only their own partitions; runs (and groundtruth files)
+    # that disappeared are dropped from every table. rebuild=True first deletes the tables (or, with
+    # apps, those apps' partitions).
+    schemas = table_schemas()
+    root = resolve_repo_root(repo_root)
+    warehouse = resolve_under(root, warehouse_dir)
+    out_root = resolve_under(root, output_root)
+    gt_dir = resolve_under(root, groundtruth_dir)
+    only = set(apps) if apps else None
+
+    warehouse.mkdir(parents=True, exist_ok=True)
+    manifest = load_manifest(warehouse)
+    if rebuild:
+        # Only the selected apps are rebuilt; the others keep their partitions.
+        for table in (*RUN_TABLES, "groundtruth_sinks"):
+            table_dir = warehouse / table
+            if only is None:
+                if table_dir.is_dir():
+                    shutil.rmtree(table_dir)
+                continue
+            for app in only:
+                drop_partition(table_dir / f"app={app}")
+        manifest["runs"] = {k: v for k, v in manifest["runs"].items() if only is not None and k.partition("/")[0] not in only}
+        manifest["groundtruth"] = {k: v for k, v in manifest["groundtruth"].items() if only is not None and k not in only}
+    stats = ExportStats()
+
+    seen: set[str] = set()
+    for app, run_dir in iter_run_dirs(out_root):
+        if only is not None and app not in only:
+            continue
+        key = f"{app}/{run_dir.name}"
+        seen.add(key)
+        sig = file_signature(run_dir / "meta.json")
+        if manifest["runs"].get(key) == sig:
+            stats.skipped_runs += 1
+            continue
+        for table, rows in flatten_run(run_dir).items():
+            write_partition(warehouse / table / f"app={app}" / f"run={run_dir.name}", rows, schemas[table])
+            stats.rows[table] = stats.rows.get(table, 0) + len(rows)
+        manifest["runs"][key] = sig
+        stats.exported_runs.append(key)
+
+    for key in sorted(manifest["runs"]):
+        app, _, run = key.partition("/")
+        if key in seen or (only is not None and app not in only):
+            continue
+        for table in RUN_TABLES:
+            drop_partition(warehouse / table / f"app={app}" / f"run={run}")
+        del manifest["runs"][key]
+        stats.removed_runs.append(key)
+
+    gt_seen: set[str] = set()
+    for gt_file in sorted(gt_dir.glob("*.json")) if gt_dir.is_dir() else []:
+        app = gt_file.stem
+        if only is not None and app not in only:
+            continue
+        gt_seen.add(app)
+        sig = file_signature(gt_file)
+        if manifest["groundtruth"].get(app) == sig:
+            continue
+        rows = flatten_groundtruth_sinks(gt_file)
+        write_partition(warehouse / "groundtruth_sinks" / f"app={app}", rows, schemas["groundtruth_sinks"])
+        stats.rows["groundtruth_sinks"] = stats.rows.get("groundtruth_sinks", 0) + len(rows)
+        manifest["groundtruth"][app] = sig
+        stats.exported_groundtruth.append(app)
+
+    for app in sorted(manifest["groundtruth"]):
+        if app in gt_seen or (only is not None and app not in only):
+            continue
+        drop_partition(warehouse / "groundtruth_sinks" / f"app={app}")
+        del manifest["groundtruth"][app]
+        stats.removed_groundtruth.append(app)
+
+    save_manifest(warehouse, manifest)
+    return stats
+
+
+def open_table(warehouse_dir: str | Path, table: str, *, repo_root: str | Path | None = None):
+    # Returns a pyarrow.dataset.Dataset with app/run exposed as (string) columns.
+    require_pyarrow()
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    warehouse = resolve_under(resolve_repo_root(repo_root), warehouse_dir)
+    table_dir = warehouse / table
+    if not table_dir.is_dir():
+        raise FileNotFoundError(f"Missing warehouse table: {table_dir}")
+    fields = [("app", pa.string())] if table == "groundtruth_sinks" else [("app", pa.string()), ("run", pa.string())]
+    partitioning = ds.partitioning(pa.schema(fields), flavor="hive")
+    return ds.dataset(table_dir, format="parquet", partitioning=partitioning)
+
+
+def latest_runs(warehouse_dir: str | Path, *, repo_root: str | Path | None = None) -> set[tuple[str, str]]:
+    runs = open_table(warehouse_dir, "runs", repo_root=repo_root).to_table(columns=["app", "run"]).to_pylist()
+    latest: dict[str, str] = {}
+    for r in runs:
+        latest[r["app"]] = max(latest.get(r["app"], ""), r["run"])
+    return set(latest.items())
+
+
+def query_warehouse(
+    warehouse_dir: str | Path,
+    table: str,
+    *,
+    where: dict[str, object] | None = None,
+    group_by: list[str] | None = None,
+    columns: list[str] | None = None,
+    latest_only: bool = False,
+    top: int | None = None,
+    repo_root: str | Path | None = None,
+):
+    # Small helper for the common cases: equality filters, optional restriction to the latest run per
+    # app, and "count rows grouped by <keys>" sorted descending. Returns a pyarrow.Table.
+    import pyarrow.dataset as ds
+
+    dataset = open_table(warehouse_dir, table, repo_root=repo_root)
+    expr = None
+    for k, v in (where or {}).items():
+        cond = ds.field(k) == v
+        expr = cond if expr is None else expr & cond
+    if latest_only and table != "groundtruth_sinks":
+        latest = None
+        for a, r in sorted(latest_runs(warehouse_dir, repo_root=repo_root)):
+            cond = (ds.field("app") == a) & (ds.field("run") == r)
+            latest = cond if latest is None else latest | cond
+        if latest is not None:
+            expr = latest if expr is None else expr & latest
+
+    needed = None
+    if columns or group_by:
+        needed = list(dict.fromkeys([*(columns or []), *(group_by or [])]))
+    result = dataset.to_table(columns=needed, filter=expr)
+    if group_by:
+        result = result.group_by(group_by).aggregate([([], "count_all")]).rename_columns([*group_by, "count"])
+        result = result.sort_by([("count", "descending"), *[(k, "ascending") for k in group_by]])
+    if top is not None:
+        result = result.slice(0, top)
+    return result
+
+
+def missed_sinks(
+    warehouse_dir: str | Path,
+    *,
+    group_by: list[str] | None = None,
+    latest_only: bool = False,
+    top: int | None = None,
+    repo_root: str | Path | None = None,
+):
+    # Groundtruth sinks absent from a run's sinks.json (same key as eval_sinks: filePath, line,
+    # apiKey), evaluated for every exported run of each app and counted by group_by
+    # (any of app/run/apiKey/graphBackend/llmProvider/llmModel; default apiKey).
+    keys = ["app", "filePath", "line", "apiKey"]
+    gt = open_table(warehouse_dir, "groundtruth_sinks", repo_root=repo_root).to_table(columns=keys)
+    runs = query_warehouse(warehouse_dir, "runs", columns=["app", "run", *RUN_INPUT_COLUMNS], latest_only=latest_only, repo_root=repo_root)
+    pred = open_table(warehouse_dir, "sinks", repo_root=repo_root).to_table(columns=[*keys, "run"])
+
+    expected = gt.join(runs, keys="app", join_type="inner")
+    missed = expected.join(pred, keys=[*keys, "run"], join_type="left anti")
+    group_by = group_by or ["apiKey"]
+    result = missed.group_by(group_by).aggregate([([], "count_all")]).rename_columns([*group_by, "count"])
+    result = result.sort_by([("count", "descending"), *[(k, "ascending") for k in group_by]])
+    return result.slice(0, top) if top is not None else result
+
+
+def format_table(table) -> str:
+    headers = list(table.column_names)
+    return render_rows(headers, [["" if r[h] is None else str(r[h]) for h in headers] for r in table.to_pylist()])
+
+
+INT_COLUMNS = ("line", "position", "flowLength", "importLine")
+BOOL_COLUMNS = ("isLast", "dataflowSkipped")
+
+
+def parse_where(items: list[str]) -> dict[str, object]:
+    out: dict[str, object] = {}
+    for item in items:
+        k, sep, v = item.partition("=")
+        if not sep or not k.strip():
+            raise ValueError(f"Invalid --where (expected key=value): {item}")
+        value: object = v.strip()
+        if k.strip() in INT_COLUMNS:
+            value = int(v)
+        elif k.strip() in BOOL_COLUMNS:
+            value = v.strip().lower() in ("1", "true", "yes")
+        out[k.strip()] = value
+    return out
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Export output/<app>/<run>/ artifacts into partitioned Parquet tables, or query them.",
+    )
+    parser.add_argument("--repo-root", default="", help="Repo root (default: auto-detect)")
+    parser.add_argument("--warehouse", default="output/_warehouse", help="Warehouse dir (default: output/_warehouse)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_export = sub.add_parser("export", help="Export new runs (incremental)")
+    p_export.add_argument("--output-root", default="output", help="Output root dir (default: output)")
+    p_export.add_argument("--groundtruth-dir", default="groundtruth/sink", help="Sink groundtruth dir (default: groundtruth/sink)")
+    p_export.add_argument("--app", action="append", default=[], help="Only export this app (repeatable)")
+    p_export.add_argument("--rebuild", action="store_true", help="Delete the tables (only the --app partitions with --app) and re-export")
+
+    p_query = sub.add_parser("query", help="Filter / group-count a table")
+    p_query.add_argument("table", choices=[*RUN_TABLES, "groundtruth_sinks"])
+    p_query.add_argument("--where", action="append", default=[], help="Equality filter key=value (repeatable)")
+    p_query.add_argument("--group-by", default="", help="Comma separated columns to count by")
+    p_query.add_argument("--columns", default="", help="Comma separated columns to select")
+    p_query.add_argument("--latest", action="store_true", help="Only the latest run per app")
+    p_query.add_argument("--top", type=int, default=20, help="Max rows to print (default: 20)")
+    p_query.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    p_missed = sub.add_parser("missed", help="Count groundtruth sinks missed by each run")
+    p_missed.add_argument("--group-by", default="apiKey", help="Comma separated columns to count by (default: apiKey)")
+    p_missed.add_argument("--latest", action="store_true", help="Only the latest run per app")
+    p_missed.add_argument("--top", type=int, default=20, help="Max rows to print (default: 20)")
+    p_missed.add_argument("--format", default="text", choices=["text", "json"], help="Output format (default: text)")
+    args = parser.parse_args(argv)
+
+    repo_root = args.repo_root or None
+    if args.command == "export":
+        stats = export_warehouse(
+            args.warehouse,
+            repo_root=repo_root,
+            output_root=args.output_root,
+            groundtruth_dir=args.groundtruth_dir,
+            apps=args.app or None,
+            rebuild=args.rebuild,
+        )
+        print(f"Exported runs: {len(stats.exported_runs)} (unchanged: {stats.skipped_runs}, removed: {len(stats.removed_runs)})")
+        print(f"Exported groundtruth apps: {len(stats.exported_groundtruth)} (removed: {len(stats.removed_groundtruth)})")
+        for table, n in sorted(stats.rows.items()):
+            print(f"  {table}: {n} rows")
+        return 0
+
+    if args.command == "missed":
+        result = missed_sinks(
+            args.warehouse,
+            group_by=split_columns(args.group_by) or None,
+            latest_only=args.latest,
+            top=args.top,
+            repo_root=repo_root,
+        )
+    else:
+        result = query_warehouse(
+            args.warehouse,
+            args.table,
+            where=parse_where(args.where),
+            group_by=split_columns(args.group_by) or None,
+            columns=split_columns(args.columns) or None,
+            latest_only=args.latest,
+            top=args.top,
+            repo_root=repo_root,
+        )
+    if args.format == "json":
+        print(json.dumps(result.to_pylist(), indent=2, ensure_ascii=False))
+    else:
+        print(format_table(result))
+    return 0
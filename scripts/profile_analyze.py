@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Thin CLI wrapper; the sampler lives in scripts/oh_eval/profiling.py.
+
+from __future__ import annotations
+
+import sys
+
+from oh_eval.profiling import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
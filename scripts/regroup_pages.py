@@ -0,0 +1,14 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Thin CLI wrapper; the re-aggregation lives in scripts/oh_eval/regroup.py.
+
+from __future__ import annotations
+
+import sys
+
+from oh_eval.regroup import main
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+
+import sys
+from pathlib import Path
+
+# The scripts are run from the repo root without installation; make `oh_eval` importable the same way.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
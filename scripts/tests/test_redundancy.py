@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+from oh_eval.redundancy import RunRedundancy, fit_latency_model, node_key
+
+
+def run(flows, nodes, seconds):
+    return RunRedundancy(
+        app="A", run="r", run_id="A_r", flows=flows, nodes=nodes, unique_nodes=nodes, trie_nodes=nodes,
+        node_memo_calls=flows, prefix_memo_calls=flows, fully_shared_flows=0, prefix_depths={}, top_nodes=[],
+        dataflow_sec=seconds,
+    )
+
+
+def test_fit_without_keyable_nodes_uses_the_call_term():
+    model = fit_latency_model([run(3, 0, 120.0)])
+    assert model is not None
+    assert (model.call_sec, model.node_sec) == (40.0, 0.0)
+
+
+def test_fit_without_measured_runs():
+    assert fit_latency_model([run(3, 9, None)]) is None
+
+
+def test_node_key_accepts_integral_float_and_string_lines():
+    key = ("entry/a.ets", 12, "foo()")
+    assert node_key({"filePath": "entry\\a.ets", "line": 12.0, "code": " foo() "}) == key
+    assert node_key({"filePath": "entry/a.ets", "line": "12", "code": "foo()"}) == key
+    assert node_key({"filePath": "entry/a.ets", "line": None}) is None
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+
+from oh_eval.regroup import collect_snippets, regroup_runs
+
+
+def write_run(run_dir, ui_tree, dataflows):
+    run_dir.mkdir(parents=True)
+    (run_dir / "meta.json").write_text("{}", encoding="utf-8")
+    (run_dir / "ui_tree.json").write_text(json.dumps(ui_tree), encoding="utf-8")
+    (run_dir / "dataflows.json").write_text(json.dumps(dataflows), encoding="utf-8")
+
+
+def test_collect_snippets_ignores_malformed_containers():
+    assert collect_snippets({"nodes": [1, 2]}, {"flows": {"a": 1}}) == {}
+    assert collect_snippets({"nodes": {"n": "x"}}, {"flows": [{"nodes": "x"}, 3]}) == {}
+
+
+def test_bad_run_is_reported_and_the_batch_continues(tmp_path):
+    flow = {"flowId": "flow_1", "nodes": [{"id": "n1", "filePath": "a.ets", "line": 3}]}
+    write_run(tmp_path / "output" / "Good" / "20260101-000000", {"nodes": {}}, {"flows": [flow]})
+    write_run(tmp_path / "output" / "Odd" / "20260101-000000", {"nodes": [1], "roots": [{}]}, {"flows": [flow, 7]})
+    write_run(tmp_path / "output" / "Bad" / "20260101-000000", {"nodes": {}}, {"flows": [{**flow, "meta": ["x"]}]})
+
+    results = {r.app: r for r in regroup_runs(repo_root=tmp_path, out=tmp_path / "regroup")}
+
+    assert set(results) == {"Good", "Odd", "Bad"}
+    assert results["Bad"].error.startswith("AttributeError")
+    for app in ("Good", "Odd"):
+        assert not results[app].error
+        assert results[app].diff["counts"]["flows"] == 1
+        assert (tmp_path / "regroup" / app / "20260101-000000" / "pages" / "index.json").is_file()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from oh_eval.search import build_search_index, query_search_index
+
+
+def write_run(root, app, run, descriptions):
+    run_dir = root / "output" / app / run
+    run_dir.mkdir(parents=True)
+    (run_dir / "meta.json").write_text(json.dumps({"runId": f"{app}_{run}"}), encoding="utf-8")
+    nodes = [{"id": f"n{i}", "filePath": "a.ets", "line": i + 1, "description": d} for i, d in enumerate(descriptions)]
+    (run_dir / "dataflows.json").write_text(json.dumps({"flows": [{"flowId": "f1", "nodes": nodes}]}), encoding="utf-8")
+
+
+def apps_of(hits):
+    return sorted({h.app for h in hits})
+
+
+def test_rebuild_with_app_keeps_other_apps(tmp_path):
+    write_run(tmp_path, "A", "20260101-000000", ["读取手机号"])
+    write_run(tmp_path, "B", "20260101-000000", ["上传手机号"])
+    index = tmp_path / "index.sqlite"
+    build_search_index(index, repo_root=tmp_path)
+    assert apps_of(query_search_index("手机号", index, repo_root=tmp_path)) == ["A", "B"]
+
+    stats = build_search_index(index, repo_root=tmp_path, apps=["A"], rebuild=True)
+
+    assert stats.indexed_runs == ["A/20260101-000000"]
+    assert apps_of(query_search_index("手机号", index, repo_root=tmp_path)) == ["A", "B"]
+
+    build_search_index(index, repo_root=tmp_path, rebuild=True)
+    assert apps_of(query_search_index("手机号", index, repo_root=tmp_path)) == ["A", "B"]
+
+
+def test_query_matching_more_texts_than_sqlite_variables(tmp_path, monkeypatch):
+    import sqlite3
+
+    import oh_eval.search as search
+
+    if not hasattr(sqlite3.Connection, "setlimit"):
+        pytest.skip("needs Connection.setlimit (Python 3.11+)")
+    write_run(tmp_path, "A", "20260101-000000", [f"的 {n}" for n in range(2000)])
+    index = tmp_path / "index.sqlite"
+    build_search_index(index, repo_root=tmp_path)
+
+    # Builds differ (999 before SQLite 3.32, 32766 after, some distros raise it further); pin the
+    # old default so matching more texts than that is tested everywhere.
+    open_index = search.open_index
+
+    def open_limited(index_file):
+        conn = open_index(index_file)
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+        return conn
+
+    monkeypatch.setattr(search, "open_index", open_limited)
+    assert len(query_search_index("的", index, repo_root=tmp_path)) == 2000
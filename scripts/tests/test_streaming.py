@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from oh_eval.streaming import SpillFile, external_sort, iter_json_array
+
+MIXED = [
+    1500.0,
+    2,
+    -0.25,
+    1e5,
+    12345678901234567890,
+    True,
+    False,
+    None,
+    "",
+    "隐私数据 🔒",
+    {"文件": "entry/src/main/ets/pages/Index.ets", "行号": 42, "nested": [1.5, {"x": None}]},
+    [],
+    [[], {}, "]", ","],
+]
+
+
+def parse(path, chunk_size):
+    return list(iter_json_array(path, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", range(1, 9))
+@pytest.mark.parametrize(
+    "text",
+    [
+        json.dumps(MIXED, ensure_ascii=False),
+        json.dumps(MIXED, ensure_ascii=False, indent=2),
+        json.dumps(MIXED),  # \u escapes and surrogate pairs cut at every position
+        '[{"k": [false, true, null]}, {"a" : {"b": -1.5E+3}}]',
+        "[1500.0, 2]",
+        "[ 1e5 ,-3 , 0.5e-2\n]",
+    ],
+)
+def test_round_trips_mixed_arrays_at_tiny_chunk_sizes(tmp_path, chunk_size, text):
+    path = tmp_path / "a.json"
+    path.write_bytes(text.encode("utf-8"))
+    raw = path.read_bytes()
+
+    items = parse(path, chunk_size)
+
+    assert [value for _, _, value in items] == json.loads(text)
+    for offset, length, value in items:
+        assert json.loads(raw[offset:offset + length].decode("utf-8")) == value
+
+
+@pytest.mark.parametrize("text", ["[]", "  [ \n ]  "])
+def test_empty_array(tmp_path, text):
+    path = tmp_path / "a.json"
+    path.write_text(text, encoding="utf-8")
+    assert parse(path, 1) == []
+
+
+@pytest.mark.parametrize("text", ["{}", "[1, 2", "[1 2]", '["a" "b"]', ""])
+def test_rejects_malformed_input(tmp_path, text):
+    path = tmp_path / "a.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        parse(path, 2)
+
+
+def test_external_sort_merges_spilled_runs(tmp_path):
+    items = [(n % 7, n) for n in range(100)]
+    merged, runs = external_sort(items, str(tmp_path), memory_budget_bytes=10, item_size=lambda _: 1)
+    assert runs > 1
+    assert list(merged) == sorted(items)
+
+
+def test_spill_file_iterates_repeatedly_and_cleans_up():
+    spill = SpillFile(prefix="oh-eval-test-")
+    for n in range(5):
+        spill.append((n, str(n)))
+    path = spill.path
+
+    assert len(spill) == 5
+    assert list(spill) == list(spill) == [(n, str(n)) for n in range(5)]
+
+    del spill
+    assert not os.path.exists(path)
+
+
+def test_malformed_element_fails_without_reading_the_tail(tmp_path, monkeypatch):
+    import oh_eval.streaming as streaming
+
+    path = tmp_path / "a.json"
+    tail = ", ".join(json.dumps({"n": n, "text": "x" * 200}) for n in range(40000))
+    path.write_text('[{"a": 1}, {"b" 2}, ' + tail + "]", encoding="utf-8")
+    read = [0]
+
+    class CountingFile:
+        def __init__(self, f):
+            self.f = f
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            self.f.close()
+
+        def read(self, size=-1):
+            data = self.f.read(size)
+            read[0] += len(data)
+            return data
+
+    monkeypatch.setattr(streaming, "open", lambda *a, **kw: CountingFile(open(*a, **kw)), raising=False)
+    with pytest.raises(ValueError):
+        list(iter_json_array(path, chunk_size=4096))
+
+    assert path.stat().st_size > 8_000_000
+    assert read[0] <= 4 * 4096
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import annotations
+
+import json
+
+from oh_eval.warehouse import flatten_run
+
+
+def test_flows_are_tagged_by_their_last_node_on_a_sink_site(tmp_path):
+    (tmp_path / "meta.json").write_text("{}", encoding="utf-8")
+    sinks = [
+        {"App源码文件路径": "a.ets", "调用行号": 10, "__apiKey": " @ohos.hilog.info "},
+        {"App源码文件路径": "a.ets", "调用行号": 20, "__apiKey": "@ohos.router.pushUrl"},
+    ]
+    flows = [
+        # Continues past the sink call; the earlier sink node must not win either.
+        {"flowId": "f1", "nodes": [
+            {"filePath": "a.ets", "line": 10},
+            {"filePath": "a.ets", "line": "20"},
+            {"filePath": "a.ets", "line": 30},
+        ]},
+        {"flowId": "f2", "nodes": [{"filePath": "a.ets", "line": 30}]},
+    ]
+    (tmp_path / "sinks.json").write_text(json.dumps(sinks), encoding="utf-8")
+    (tmp_path / "dataflows.json").write_text(json.dumps({"flows": flows}), encoding="utf-8")
+
+    tables = flatten_run(tmp_path)
+
+    assert [r["apiKey"] for r in tables["sinks"]] == ["@ohos.hilog.info", "@ohos.router.pushUrl"]
+    tags = {(r["flowId"], r["position"]): r["sinkApiKey"] for r in tables["dataflow_nodes"]}
+    assert {tags[("f1", i)] for i in range(3)} == {"@ohos.router.pushUrl"}
+    assert tags[("f2", 0)] is None
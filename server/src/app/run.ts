@@ -3,7 +3,7 @@ import fs from 'node:fs/promises';
 import path from 'node:path';
 import { fileURLToPath, pathToFileURL } from 'node:url';
 
-import { runAnalysis, type AnalyzeRequest, type GraphBackend } from '../analyzer/api.js';
+import { DEFAULT_APP_PATH, runAnalysis, type AnalyzeRequest, type GraphBackend } from '../analyzer/api.js';
 import { ensureDir, readJsonFile, writeJsonFile } from '../utils/accessWorkspace.js';
 
 dotenv.config({ path: path.resolve(path.dirname(fileURLToPath(import.meta.url)), '..', '..', '..', '.env'), quiet: true });
@@ -253,6 +253,7 @@ async function main(): Promise<void> {
 
   const thisFile = fileURLToPath(import.meta.url);
   const repoRoot = args.repoRoot ? path.resolve(args.repoRoot) : path.resolve(path.dirname(thisFile), '..', '..', '..');
+  const appName = path.basename(path.resolve(args.appPath ?? DEFAULT_APP_PATH));
   const result = await runAnalysis({
     repoRoot,
     appPath: args.appPath,
@@ -269,6 +270,12 @@ async function main(): Promise<void> {
     privacyReportLlmProvider: args.privacyReportLlmProvider,
     privacyReportLlmApiKey: args.privacyReportLlmApiKey,
     privacyReportLlmModel: args.privacyReportLlmModel,
+  }, {
+    // Progress goes to stderr so stdout stays a single JSON document; the line format matches the
+    // batch logs (`app-progress ... stage=<name>`) and is what scripts/profile_analyze.py aligns on.
+    onProgress: (progress) => {
+      process.stderr.write(`[${new Date().toISOString()}] app-progress app=${appName} percent=${progress.percent} stage=${progress.stage}\n`);
+    },
   });
 
   process.stdout.write(`${JSON.stringify({ ok: true, result }, null, 2)}\n`);